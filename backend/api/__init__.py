@@ -1,12 +1,24 @@
 # api/__init__.py
 from .api_utils import (
     build_urls,
+    build_incremental_urls,
+    get_observation_starts,
     get_responses,
+    get_payloads,
+    get_series_id,
+    get_observations_frame,
+    parse_observations,
     DateEncoder,
     select_target_responses,
     increase_frequency,
     backwards_fill,
     interpolate_data,
+    transform_observations,
     recombine_data,
 )
+from .fred_client import FredClient, TokenBucket, RequestStats
+from .response_cache import ResponseCache
+from .route_cache import RouteCache, route_cache
+from .downsample import lttb, build_pyramids, downsample_rows, pyramid_level
+from .snapshot import AnalysisSnapshot, analysis_snapshot
 from .routes import router as data_router
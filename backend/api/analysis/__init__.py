@@ -1 +1,5 @@
 from .analysis_utils import *
+from .pipeline import run_model, run_models
+from .unit_root import UnitRootService, unit_root_service
+from .model_cache import FittedModel, ModelCache, model_cache, model_fingerprint
+from .backtest import backtest, forecast_metrics, rolling_origins
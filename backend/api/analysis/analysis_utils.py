@@ -1,17 +1,19 @@
 from sqlalchemy.engine import Row
 from statsmodels.tsa.vector_ar.vecm import (
     select_coint_rank,
-    select_order,
     VECM,
     VECMResults,
 )
 from statsmodels.tsa.statespace.tools import diff
-from statsmodels.tsa.stattools import adfuller
 from pandas import DataFrame, Series, date_range, concat, to_datetime
 from pandas.tseries.offsets import Day
 
 from typing import Dict, Tuple, List
 
+from .unit_root import unit_root_service
+from .lag_order import select_lag_order
+from ..config import COINT_RANK_SETTINGS, LAG_ORDER_SETTINGS, VECM_SETTINGS
+
 
 def pivot_data(data: List[Row]) -> DataFrame:
     """
@@ -36,27 +38,14 @@ def select_series(df: DataFrame, series_ids: List[str]) -> DataFrame:
 def unit_root_test(df: DataFrame) -> Dict[str, float]:
     """
     Get p-value for Augmented Dickey-Fuller unit root test,
-    to check if series are stationary.
-    """
-    result = {}
-    for series in df.columns:
-        p_value = adfuller(
-            df[series],
-            maxlag=None,
-            regression="ctt",
-            autolag="AIC",
-            store=False,
-            regresults=False,
-        )
-        result[series] = p_value[1]
-    return result
+    to check if series are stationary. Results are memoized per series values.
+    """
+    return unit_root_service.test(df)
 
 
-def difference_series(
-    df: DataFrame, p_values: Dict[str, float]
-) -> Tuple[DataFrame, Dict[str, float]]:
+def difference_frame(df: DataFrame, p_values: Dict[str, float]) -> DataFrame:
     """
-    Difference non-stationary series and re-test with adfuller.
+    Difference non-stationary series.
     """
     df_copy = df.copy()
     for series, p_value in p_values.items():
@@ -66,9 +55,18 @@ def difference_series(
             )
         else:
             pass
-    df_differenced = df_copy.bfill(
+    return df_copy.bfill(
         limit_area="outside"
     )  # Filling any Nans, TODO: Not the most preferable way to deal with nans
+
+
+def difference_series(
+    df: DataFrame, p_values: Dict[str, float]
+) -> Tuple[DataFrame, Dict[str, float]]:
+    """
+    Difference non-stationary series and re-test with adfuller.
+    """
+    df_differenced = difference_frame(df, p_values)
     return df_differenced, unit_root_test(df_differenced)
 
 
@@ -76,9 +74,7 @@ def cointegration_rank(df: DataFrame) -> int:
     """
     Perform Johansen cointegration test.
     """
-    result = select_coint_rank(
-        df, det_order=0, k_ar_diff=1, method="trace", signif=0.05
-    )
+    result = select_coint_rank(df, **COINT_RANK_SETTINGS)
     return result.rank
 
 
@@ -86,9 +82,7 @@ def get_lag_order(df: DataFrame) -> int:
     """
     Get the lag order for the VECM model.
     """
-    result = select_order(
-        df, maxlags=15, deterministic="cili", seasons=4, exog=None, exog_coint=None
-    )
+    result = select_lag_order(df, **LAG_ORDER_SETTINGS)
     return (result.aic + result.bic + result.fpe + result.hqic) // 4
 
 
@@ -105,9 +99,7 @@ def vecm_wrapper(df_endog: DataFrame, rank: int, lag_order: int) -> VECM:
         missing="none",
         k_ar_diff=lag_order,
         coint_rank=rank,
-        deterministic="cili",
-        seasons=0,
-        first_season=0,
+        **VECM_SETTINGS,
     )
     return vecm
 
@@ -0,0 +1,128 @@
+from concurrent.futures import ProcessPoolExecutor
+from pandas import DataFrame, MultiIndex, Timestamp
+import numpy as np
+
+from typing import Dict, List, Tuple
+import warnings
+
+from .analysis_utils import (
+    select_series,
+    unit_root_test,
+    difference_frame,
+    cointegration_rank,
+    get_lag_order,
+    vecm_wrapper,
+    get_predictions,
+    inverse_difference_series,
+)
+
+# Model input frame shared with worker processes, set once per worker
+_shared_df: DataFrame = None
+
+
+def _init_worker(df: DataFrame) -> None:
+    global _shared_df
+    _shared_df = df
+
+
+def rolling_origins(
+    df: DataFrame, n_origins: int, horizon: int, step: int, min_train: int
+) -> List[Timestamp]:
+    """
+    Get forecast origins step rows apart, the last one leaving a full
+    horizon of realized data and the first one at least min_train rows in.
+    """
+    last = len(df) - horizon - 1
+    positions = [last - i * step for i in range(n_origins)]
+    return [df.index[i] for i in sorted(positions) if i >= min_train - 1]
+
+
+def _forecast_origin(
+    cutoff: Timestamp,
+    horizon: int,
+    p_values: Dict[str, float],
+    rank: int,
+    lag_order: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Refit on data up to the cutoff, keeping the model choices fixed
+    df_train = _shared_df.loc[:cutoff]
+    df_differenced = difference_frame(df_train, p_values)
+    result = vecm_wrapper(df_differenced, rank, lag_order).fit()
+
+    df_predictions = get_predictions(df_differenced, result, steps=horizon)
+    df_forecast = inverse_difference_series(df_predictions, df_train, p_values)
+    df_forecast = df_forecast.iloc[-horizon:]
+
+    # Dates past the last observation or in a gap have no realized value
+    df_actual = _shared_df.reindex(df_forecast.index)
+    return df_forecast.to_numpy(), df_actual.to_numpy()
+
+
+def forecast_metrics(
+    forecasts: np.ndarray, actuals: np.ndarray, columns: List[str]
+) -> DataFrame:
+    """
+    MAE, RMSE and MAPE per horizon and series from stacked
+    (origins x horizon x series) forecast and realized arrays. Missing
+    realized values are left out, origins counts the ones scored.
+    """
+    errors = forecasts - actuals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage_errors = np.abs(errors / np.where(actuals == 0, np.nan, actuals))
+
+    horizon = errors.shape[1]
+    index = MultiIndex.from_product(
+        [range(1, horizon + 1), columns], names=["horizon", "series_id"]
+    )
+    # Horizons without any realized value are NaN instead of warning
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return DataFrame(
+            {
+                "mae": np.nanmean(np.abs(errors), axis=0).ravel(),
+                "rmse": np.sqrt(np.nanmean(errors**2, axis=0)).ravel(),
+                "mape": 100 * np.nanmean(percentage_errors, axis=0).ravel(),
+                "origins": np.count_nonzero(~np.isnan(errors), axis=0).ravel(),
+            },
+            index=index,
+        ).reset_index()
+
+
+def backtest(
+    df: DataFrame,
+    series_ids: List[str],
+    n_origins: int,
+    horizon: int,
+    step: int,
+    max_workers: int = None,
+) -> DataFrame:
+    """
+    Rolling-origin backtest of a model group. Differencing decisions,
+    cointegration rank and lag order are selected once on the earliest
+    training window and reused by every refit, which only extends the
+    window. Refits run in parallel processes.
+    """
+    df_model = select_series(df, series_ids)
+
+    # Keep at least half of the history in the earliest training window
+    origins = rolling_origins(df_model, n_origins, horizon, step, len(df_model) // 2)
+
+    # Select model choices on the earliest window
+    df_first = df_model.loc[: origins[0]]
+    p_values = unit_root_test(df_first)
+    df_first_differenced = difference_frame(df_first, p_values)
+    rank = cointegration_rank(df_first_differenced)
+    lag_order = get_lag_order(df_first_differenced)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(df_model,)
+    ) as executor:
+        futures = [
+            executor.submit(_forecast_origin, cutoff, horizon, p_values, rank, lag_order)
+            for cutoff in origins
+        ]
+        results = [future.result() for future in futures]
+
+    forecasts = np.stack([forecast for forecast, _ in results])
+    actuals = np.stack([actual for _, actual in results])
+    return forecast_metrics(forecasts, actuals, list(df_model.columns))
@@ -0,0 +1,104 @@
+from statsmodels.tsa.vector_ar.var_model import LagOrderResults
+from statsmodels.tsa.vector_ar.vecm import select_order
+from statsmodels.tsa.vector_ar.util import seasonal_dummies
+from pandas import DataFrame
+import numpy as np
+
+from typing import Dict, List
+
+# Relative size of an R diagonal entry below which the design is treated as rank deficient
+RANK_TOLERANCE = 1e-10
+
+
+def deterministic_terms(
+    nobs_tot: int, deterministic: str, seasons: int
+) -> tuple[np.ndarray, int]:
+    """
+    Build the deterministic columns statsmodels adds in select_order and
+    the number of deterministic parameters it counts per equation.
+    """
+    columns = [np.ones(nobs_tot)]  # VAR constant
+    k_exog = 0
+    if "co" in deterministic or "ci" in deterministic:
+        # Duplicates the VAR constant, counted but adds nothing to the fit
+        k_exog += 1
+    if "lo" in deterministic or "li" in deterministic:
+        columns.append(1.0 + np.arange(nobs_tot))
+        k_exog += 1
+    if seasons > 0:
+        dummies = seasonal_dummies(seasons, nobs_tot)
+        columns.extend(dummies.T)
+        k_exog += dummies.shape[1]
+    return np.column_stack(columns), 1 + k_exog
+
+
+def lagged_design(data: np.ndarray, det: np.ndarray, maxlag: int) -> np.ndarray:
+    """
+    Stack deterministic terms and lags 1..maxlag of data, nested by lag,
+    on the common sample used for every lag candidate.
+    """
+    nobs_tot = len(data)
+    lags = [data[maxlag - lag : nobs_tot - lag] for lag in range(1, maxlag + 1)]
+    return np.hstack([det[maxlag:], *lags])
+
+
+def select_lag_order(
+    data: DataFrame | np.ndarray,
+    maxlags: int,
+    deterministic: str = "n",
+    seasons: int = 0,
+) -> LagOrderResults:
+    """
+    Compute VECM lag order selections for AIC, BIC, FPE and HQIC in one pass,
+    matching statsmodels select_order. The lagged design matrix is built once
+    and a single QR decomposition gives the residual covariance of every
+    nested VAR(p), p = 1..maxlags + 1, instead of one regression per candidate.
+
+    statsmodels counts a constant twice for "ci"/"co" and solves the resulting
+    rank deficient regressions with lstsq, which can land slightly off the
+    exact least squares fit for some lags. The criteria here use the exact fit.
+    """
+    y = np.asarray(data, dtype=np.float64)
+    nobs_tot, neqs = y.shape
+    maxlag = maxlags + 1  # +1 because k_ar_VECM == k_ar_VAR - 1
+
+    det, k_det = deterministic_terms(nobs_tot, deterministic, seasons)
+    z = lagged_design(y, det, maxlag)
+    y_sample = y[maxlag:]
+    nobs = len(y_sample)
+
+    q, r = np.linalg.qr(z)
+    diagonal = np.abs(np.diag(r))
+    if diagonal.min() < RANK_TOLERANCE * diagonal.max():
+        # Nested QR needs a full rank design, defer to statsmodels
+        return select_order(
+            data, maxlags=maxlags, deterministic=deterministic, seasons=seasons
+        )
+
+    # Residual cross products of the largest model, then add back each lag
+    # block's contribution to get the nested smaller models
+    c = q.T @ y_sample
+    resid = y_sample - q @ c
+    sse = resid.T @ resid
+
+    n_det = det.shape[1]
+    ic: Dict[str, List[float]] = {"aic": [], "bic": [], "hqic": [], "fpe": []}
+    sse_by_lag = {maxlag: sse}
+    for lag in range(maxlag - 1, 0, -1):
+        block = c[n_det + lag * neqs : n_det + (lag + 1) * neqs]
+        sse_by_lag[lag] = sse_by_lag[lag + 1] + block.T @ block
+
+    # Information criteria as in VARResults.info_criteria, Lütkepohl pp. 146-150
+    for lag in range(1, maxlag + 1):
+        _sign, ld = np.linalg.slogdet(sse_by_lag[lag] / nobs)
+        free_params = lag * neqs**2 + neqs * k_det
+        df_model = neqs * lag + k_det
+        df_resid = nobs - df_model
+        ic["aic"].append(ld + (2.0 / nobs) * free_params)
+        ic["bic"].append(ld + (np.log(nobs) / nobs) * free_params)
+        ic["hqic"].append(ld + (2.0 * np.log(np.log(nobs)) / nobs) * free_params)
+        ic["fpe"].append(((nobs + df_model) / df_resid) ** neqs * np.exp(ld))
+
+    # Index of the minimum is the number of lagged differences in the VECM
+    selected_orders = {name: int(np.argmin(values)) for name, values in ic.items()}
+    return LagOrderResults(ic, selected_orders, True)
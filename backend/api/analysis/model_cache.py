@@ -0,0 +1,91 @@
+from statsmodels.tsa.vector_ar.vecm import VECMResults
+from pandas import DataFrame, util
+
+from dataclasses import dataclass
+from typing import Dict, List
+from pathlib import Path
+from hashlib import sha256
+import pickle
+import json
+import os
+
+from ..config import (
+    MODEL_CACHE_DIR,
+    MODEL_CACHE_MAX_FILES,
+    COINT_RANK_SETTINGS,
+    LAG_ORDER_SETTINGS,
+    VECM_SETTINGS,
+)
+from ..file_utils import atomic_write_bytes, prune_files
+
+
+@dataclass
+class FittedModel:
+    rank: int
+    lag_order: int
+    result: VECMResults
+
+
+def model_fingerprint(df: DataFrame, series_ids: List[str]) -> str:
+    """
+    Hash the model input frame, series list and deterministic settings.
+    """
+    digest = sha256(util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(
+        json.dumps(
+            {
+                "series_ids": series_ids,
+                "columns": list(df.columns),
+                "coint_rank": COINT_RANK_SETTINGS,
+                "lag_order": LAG_ORDER_SETTINGS,
+                "vecm": VECM_SETTINGS,
+            },
+            sort_keys=True,
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Fitted VECM results with their cointegration rank and lag order,
+    pickled on disk and kept in memory, keyed by model_fingerprint.
+    """
+
+    def __init__(self, directory: str | Path = MODEL_CACHE_DIR) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.models: Dict[str, FittedModel] = {}
+
+    def get(self, key: str) -> FittedModel:
+        if key in self.models or self.directory is None:
+            return self.models.get(key)
+        path = self.directory / f"{key}.pkl"
+        try:
+            with open(path, "rb") as file:
+                self.models[key] = pickle.load(file)
+            # Touch the file so pruning sees it as recently used
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return self.models[key]
+
+    def set(self, key: str, fitted_model: FittedModel) -> None:
+        self.models[key] = fitted_model
+        if self.directory is None:
+            return
+        atomic_write_bytes(
+            self.directory / f"{key}.pkl",
+            pickle.dumps(fitted_model, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def prune(self, keep: int = MODEL_CACHE_MAX_FILES) -> int:
+        """
+        Delete all but the keep most recently used pickled models on disk.
+        """
+        if self.directory is None:
+            return 0
+        return prune_files(self.directory, "*.pkl", keep)
+
+
+# Process-wide cache used by run_model
+model_cache = ModelCache()
@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+from pandas import DataFrame
+
+from typing import Dict, List, Tuple
+from itertools import chain
+
+from .analysis_utils import (
+    select_series,
+    unit_root_test,
+    difference_series,
+    cointegration_rank,
+    get_lag_order,
+    vecm_wrapper,
+    get_predictions,
+    inverse_difference_series,
+    melt_data,
+)
+from .unit_root import unit_root_service
+from .model_cache import FittedModel, model_cache, model_fingerprint
+from ..metrics import Span, metrics
+
+# Pivoted frame shared with worker processes, set once per worker
+_shared_df: DataFrame = None
+
+
+def _init_worker(df: DataFrame, unit_root_results: Dict[str, float]) -> None:
+    global _shared_df
+    _shared_df = df
+    unit_root_service.results.update(unit_root_results)
+
+    # Forked workers inherit the parent's spans, only report their own
+    metrics.reset()
+
+
+def run_model(df: DataFrame, series_ids: List[str], model: str, steps: int) -> DataFrame:
+    """
+    Run the full analysis pipeline for one model group and return
+    the forecast steps in long schema with a categorical model column.
+    """
+    # Select group of series for analysis
+    df_model = select_series(df, series_ids)
+
+    with metrics.span("adf", model=model) as span:
+        # Test for unit root to check if series are stationary
+        p_values_before = unit_root_test(df_model)
+
+        # Difference non-stationary series and re-test with adfuller
+        df_differenced, _p_values_after = difference_series(df_model, p_values_before)
+        span.rows = len(df_differenced)
+
+    # Reuse rank, lag order and fit when the model input is unchanged
+    key = model_fingerprint(df_differenced, series_ids)
+    fitted_model = model_cache.get(key)
+    if fitted_model is None:
+        # Get cointegration rank and lag order for VECM
+        with metrics.span("rank", model=model) as span:
+            rank = cointegration_rank(df_differenced)
+            span.rows = len(df_differenced)
+        with metrics.span("lag", model=model) as span:
+            lag_order = get_lag_order(df_differenced)
+            span.rows = len(df_differenced)
+
+        # Fit VECM model
+        with metrics.span("fit", model=model) as span:
+            result = vecm_wrapper(df_differenced, rank, lag_order).fit()
+            span.rows = len(df_differenced)
+        fitted_model = FittedModel(rank, lag_order, result)
+        model_cache.set(key, fitted_model)
+
+    with metrics.span("predict", model=model) as span:
+        # Get predictions from VECM model
+        df_predictions = get_predictions(
+            df_differenced, fitted_model.result, steps=steps
+        )
+
+        # Inverse series differencing to get predictions in original scale
+        df_forecast = inverse_difference_series(
+            df_predictions, df_model, p_values_before
+        )
+
+        # History is only needed to undo differencing, keep the forecast rows
+        df_forecast = df_forecast.iloc[-steps:]
+
+        # Inverse pivoting of dataframe back to original long schema
+        df_forecast_long = melt_data(df_forecast)
+        df_forecast_long["model"] = model
+        span.rows = len(df_forecast_long)
+    return df_forecast_long
+
+
+def _run_shared_model(
+    series_ids: List[str], model: str, steps: int
+) -> Tuple[DataFrame, List[Span]]:
+    df_forecast_long = run_model(_shared_df, series_ids, model, steps)
+    return df_forecast_long, metrics.drain_spans()
+
+
+def run_models(
+    df: DataFrame,
+    models: Dict[str, List[str]],
+    steps: int,
+    max_workers: int = None,
+) -> Dict[str, DataFrame]:
+    """
+    Run each model group's pipeline in its own process and collect forecasts.
+    The pivoted frame is handed to each worker once, not once per task.
+    """
+    # Test every series used by any model once, before and after differencing,
+    # so series shared between models are not re-tested in each worker
+    all_series = list(dict.fromkeys(chain.from_iterable(models.values())))
+    with metrics.span("adf", model="all") as span:
+        df_union = select_series(df, all_series)
+        difference_series(df_union, unit_root_test(df_union))
+        span.rows = len(df_union)
+
+    max_workers = max_workers or len(models)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(df, unit_root_service.results),
+    ) as executor:
+        futures = {
+            model: executor.submit(_run_shared_model, series_ids, model, steps)
+            for model, series_ids in models.items()
+        }
+        forecasts = {}
+        for model, future in futures.items():
+            # Worker spans are merged into this process's run report
+            forecasts[model], spans = future.result()
+            metrics.add_spans(spans)
+        return forecasts
@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+from statsmodels.tsa.stattools import adfuller
+from pandas import DataFrame
+import numpy as np
+
+from typing import Dict, List
+from pathlib import Path
+from hashlib import sha256
+import json
+import os
+
+from ..config import ADF_CACHE_DIR, ADF_CACHE_MAX_FILES, ADF_SETTINGS
+from ..file_utils import atomic_write_bytes, prune_files
+
+
+def adf_p_value(values: np.ndarray, settings: Dict[str, str | int | None]) -> float:
+    """
+    Get p-value for Augmented Dickey-Fuller unit root test.
+    """
+    return adfuller(values, store=False, regresults=False, **settings)[1]
+
+
+def fingerprint(values: np.ndarray, settings: Dict[str, str | int | None]) -> str:
+    """
+    Hash series values together with the test settings.
+    """
+    digest = sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class UnitRootService:
+    """
+    Memoized ADF unit root tests shared across model groups. Results are
+    keyed by a fingerprint of the series values and test settings, cached in
+    memory and on disk, and missing columns are tested in parallel processes.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = ADF_CACHE_DIR,
+        settings: Dict[str, str | int | None] = ADF_SETTINGS,
+        max_workers: int = None,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.settings = settings
+        self.max_workers = max_workers
+        self.results: Dict[str, float] = {}
+
+    def _load(self, key: str) -> float:
+        if self.directory is None:
+            return None
+        path = self.directory / f"{key}.json"
+        try:
+            p_value = json.loads(path.read_text())
+            # Touch the file so pruning sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return p_value
+
+    def _store(self, key: str, p_value: float) -> None:
+        self.results[key] = p_value
+        if self.directory is None:
+            return
+        atomic_write_bytes(self.directory / f"{key}.json", json.dumps(p_value).encode())
+
+    def prune(self, keep: int = ADF_CACHE_MAX_FILES) -> int:
+        """
+        Delete all but the keep most recently used memoized p-values on disk.
+        """
+        if self.directory is None:
+            return 0
+        return prune_files(self.directory, "*.json", keep)
+
+    def _compute(self, columns: List[np.ndarray]) -> List[float]:
+        if len(columns) == 1:
+            return [adf_p_value(columns[0], self.settings)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(
+                executor.map(adf_p_value, columns, [self.settings] * len(columns))
+            )
+
+    def test(self, df: DataFrame) -> Dict[str, float]:
+        keys = {
+            series: fingerprint(df[series].to_numpy(), self.settings)
+            for series in df.columns
+        }
+
+        # Look up memory first, then disk
+        for key in set(keys.values()) - self.results.keys():
+            p_value = self._load(key)
+            if p_value is not None:
+                self.results[key] = p_value
+
+        # Test each remaining distinct series once
+        missing = {
+            key: series for series, key in keys.items() if key not in self.results
+        }
+        if missing:
+            columns = [df[series].to_numpy() for series in missing.values()]
+            for key, p_value in zip(missing, self._compute(columns)):
+                self._store(key, p_value)
+
+        return {series: self.results[key] for series, key in keys.items()}
+
+
+# Process-wide service used by unit_root_test
+unit_root_service = UnitRootService()
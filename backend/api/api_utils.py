@@ -1,16 +1,20 @@
 from urllib.parse import urlencode, urlparse, parse_qs
-from requests.exceptions import RequestException
-from aiohttp import ClientSession
 from dateutil.parser import parse
-from pandas import DataFrame, to_datetime
+from pandas import DataFrame, Categorical, to_datetime, concat
 import numpy as np
 
-from datetime import datetime, date
-from typing import List, Dict
+from datetime import datetime, date, timedelta, timezone
+from typing import Callable, List, Dict, Tuple
+from functools import partial
+from operator import itemgetter
 from json import JSONEncoder
-import asyncio
 import os
 
+from .fred_client import FredClient
+
+
+OBSERVATION_COLUMNS = ["series_id", "realtime_start", "realtime_end", "date", "value"]
+
 
 class DateEncoder(JSONEncoder):
     def default(self: JSONEncoder, obj: List[Dict[str, str | int | float]]) -> str:
@@ -50,207 +54,278 @@ def build_urls(
     ]
 
 
-async def get_json(session: ClientSession, url: str) -> dict:
-    try:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            return await response.json()
-    except RequestException as e:
-        if response:
-            print(f"Error occurred: {e}, status code: {response.status_code}")
-        else:
-            print(f"Error occurred: {e}")
-        return None
+def build_incremental_urls(
+    base_url: str,
+    endpoint: str,
+    observation_starts: Dict[str, str],
+    api_key: str = None,
+    file_type: str = "json",
+) -> List[str]:
+    if api_key is None:
+        api_key = os.getenv("FRED_API_KEY")
 
+    return [
+        build_url(
+            base_url,
+            endpoint,
+            api_key=api_key,
+            series_id=series_id,
+            file_type=file_type,
+            observation_start=observation_start,
+        )
+        for series_id, observation_start in observation_starts.items()
+    ]
 
-async def get_responses(urls: List[str]) -> List[Dict[str, str | int | float]]:
-    responses = []
-    async with ClientSession() as session:
-        tasks = [get_json(session, url) for url in urls]
-        await asyncio.sleep(0.05)
-        results = await asyncio.gather(*tasks)
-        for url, response in zip(urls, results):
-            if response is not None:
-                if "seriess" in response:
-                    response = response["seriess"][0]
-                    # Convert dates to date objects
-                    for date_field in [
-                        "realtime_start",
-                        "realtime_end",
-                        "observation_start",
-                        "observation_end",
-                    ]:
-                        response[date_field] = datetime.strptime(
-                            response[date_field], "%Y-%m-%d"
-                        ).date()
-                    # Parse last_updated to datetime
-                    response["last_updated"] = parse(response["last_updated"])
-                    responses.append(response)
-                elif "observations" in response:
-                    parsed_url = urlparse(url)
-                    query_params = parse_qs(parsed_url.query)
-                    series_id = query_params.get("series_id", [None])[0]
-                    for observation in response["observations"]:
-                        # Add series_id to observation data
-                        observation["series_id"] = series_id
-                        # Convert value to float if it's not a period
-                        if observation["value"] != ".":
-                            observation["value"] = float(observation["value"])
-                        else:
-                            observation["value"] = None
-                        # Convert dates to date objects
-                        for date_field in ["realtime_start", "realtime_end", "date"]:
-                            observation[date_field] = datetime.strptime(
-                                observation[date_field], "%Y-%m-%d"
-                            ).date()
-                        responses.append(observation)
-    return responses
 
+def get_observation_starts(
+    series_responses: List[Dict[str, str | int | float]],
+    sync_state: Dict[str, Tuple[datetime, date]],
+    observation_start: str,
+    lookback_days: int,
+) -> Dict[str, str]:
+    """
+    Compare FRED series metadata with stored state and return the observation
+    start date to request for each stale series. Up to date series are omitted.
+    """
+    default_start = date.fromisoformat(observation_start)
 
-def select_target_responses(
-    responses: List[Dict[str, str | int | float]], targets: List[str]
-) -> List[Dict[str, str | int | float]]:
+    observation_starts = {}
+    for series in series_responses:
+        last_updated, last_date = sync_state.get(series["id"], (None, None))
 
-    return [response for response in responses if response["series_id"] in targets]
+        # Series never loaded, request full history
+        if last_date is None:
+            observation_starts[series["id"]] = observation_start
+            continue
 
+        # Both timestamps are timezone aware, a DST change does not shift them
+        is_revised = last_updated != series["last_updated"]
+        has_new_observations = last_date < series["observation_end"]
+        if is_revised or has_new_observations:
+            start = max(last_date - timedelta(days=lookback_days), default_start)
+            observation_starts[series["id"]] = start.isoformat()
 
-def increase_frequency(
-    data: List[Dict[str, str | int | float]]
-) -> List[Dict[str, str | int | float]]:
+    return observation_starts
 
-    # Get unique series_id values
-    series_ids = set(item["series_id"] for item in data)
 
-    result = []
-    for series_id in series_ids:
-        # Filter data for current series_id
-        filtered_data = [item for item in data if item["series_id"] == series_id]
+async def get_payloads(
+    urls: List[str], client: FredClient = None, revisions: Dict[str, str] = None
+) -> List[Tuple[str, dict]]:
+    # Open a short-lived client when no shared client is given
+    if client is None:
+        async with FredClient() as client:
+            return await client.get_payloads(urls, revisions)
+    return await client.get_payloads(urls, revisions)
 
-        # Convert the list of dictionaries to a DataFrame
-        df = DataFrame(filtered_data)
 
-        # Convert 'date' and 'value' columns to datetime and float respectively
-        df["date"] = to_datetime(df["date"])
-        df["value"] = df["value"].astype(float)
+def get_series_id(url: str) -> str:
+    query_params = parse_qs(urlparse(url).query)
+    return query_params.get("series_id", [None])[0]
 
-        # Set 'date' as index
-        df.set_index("date", inplace=True)
 
-        # Calculate the differences and daily increments
-        df["diffs"] = df["value"].diff()
-        df["interval"] = df.index.to_series().diff().dt.days
-        df["daily_increments"] = df["diffs"] / df["interval"]
+async def get_responses(
+    urls: List[str], client: FredClient = None
+) -> List[Dict[str, str | int | float]]:
+    responses = []
+    for url, response in await get_payloads(urls, client):
+        if "seriess" in response:
+            response = response["seriess"][0]
+            # Convert dates to date objects
+            for date_field in [
+                "realtime_start",
+                "realtime_end",
+                "observation_start",
+                "observation_end",
+            ]:
+                response[date_field] = datetime.strptime(
+                    response[date_field], "%Y-%m-%d"
+                ).date()
+            # Parse last_updated to a UTC datetime, FRED reports it with a local offset
+            response["last_updated"] = parse(response["last_updated"]).astimezone(
+                timezone.utc
+            )
+            responses.append(response)
+        elif "observations" in response:
+            series_id = get_series_id(url)
+            for observation in response["observations"]:
+                # Add series_id to observation data
+                observation["series_id"] = series_id
+                # Convert value to float if it's not a period
+                if observation["value"] != ".":
+                    observation["value"] = float(observation["value"])
+                else:
+                    observation["value"] = None
+                # Convert dates to date objects
+                for date_field in ["realtime_start", "realtime_end", "date"]:
+                    observation[date_field] = datetime.strptime(
+                        observation[date_field], "%Y-%m-%d"
+                    ).date()
+                responses.append(observation)
+    return responses
+
 
-        # Resample to daily frequency, backward filling the values
-        increments = df["daily_increments"].resample("D").asfreq().bfill()
-        increments.iloc[0] = np.nan
+def _parse_dates(observations: List[Dict[str, str]], field: str) -> np.ndarray:
+    return np.array(list(map(itemgetter(field), observations)), dtype="datetime64[D]")
 
-        # Resample the DataFrame to daily frequency
-        df_daily = df.resample("D").asfreq()
-        df_daily.iloc[1:] = np.nan
 
-        # Fill the NaN values in df_daily['value'] with the corresponding values in increments
-        df_daily["value"] = df_daily["value"].fillna(increments)
+def _parse_values(observations: List[Dict[str, str]]) -> np.ndarray:
+    # FRED marks missing values with a period
+    values = np.array(list(map(itemgetter("value"), observations)), dtype=str)
+    return np.where(values == ".", "nan", values).astype(np.float64)
 
-        # Get the cumulative sum of the values
-        df_daily["value"] = df_daily["value"].cumsum()
 
-        # Forward fill the other columns
-        df_daily = df_daily.ffill()
+def parse_observations(payloads: List[Tuple[str, dict]]) -> DataFrame:
+    """
+    Parse observations payloads into one columnar DataFrame with datetime64
+    dates, float64 values (NaN for missing) and a categorical series_id.
+    """
+    payloads = [(url, payload) for url, payload in payloads if "observations" in payload]
+    if not payloads:
+        return DataFrame(columns=OBSERVATION_COLUMNS)
 
-        # Drop unnecessary columns
-        df_daily.drop(columns=["diffs", "interval", "daily_increments"], inplace=True)
+    series_codes = {}
+    codes, realtime_starts, realtime_ends, dates, values = [], [], [], [], []
+    for url, payload in payloads:
+        observations = payload["observations"]
+        code = series_codes.setdefault(get_series_id(url), len(series_codes))
+        codes.append(np.full(len(observations), code, dtype=np.int32))
+        realtime_starts.append(_parse_dates(observations, "realtime_start"))
+        realtime_ends.append(_parse_dates(observations, "realtime_end"))
+        dates.append(_parse_dates(observations, "date"))
+        values.append(_parse_values(observations))
 
-        # Convert the series back to a list of dictionaries
-        transformed_data = df_daily.reset_index().to_dict("records")
+    return DataFrame(
+        {
+            "series_id": Categorical.from_codes(
+                np.concatenate(codes), categories=list(series_codes)
+            ),
+            "realtime_start": np.concatenate(realtime_starts),
+            "realtime_end": np.concatenate(realtime_ends),
+            "date": np.concatenate(dates),
+            "value": np.concatenate(values),
+        }
+    )
 
-        # Append transformed data to result
-        result.extend(transformed_data)
 
-    return result
+async def get_observations_frame(
+    urls: List[str], client: FredClient = None, revisions: Dict[str, str] = None
+) -> DataFrame:
+    return parse_observations(await get_payloads(urls, client, revisions))
 
 
-def backwards_fill(
-    data: List[Dict[str, str | int | float]]
+def select_target_responses(
+    responses: List[Dict[str, str | int | float]], targets: List[str]
 ) -> List[Dict[str, str | int | float]]:
 
-    # Get unique series_id values
-    series_ids = set(item["series_id"] for item in data)
+    return [response for response in responses if response["series_id"] in targets]
 
-    result = []
-    for series_id in series_ids:
 
-        # Filter data for current series_id
-        filtered_data = [item for item in data if item["series_id"] == series_id]
+def _increment_series(df: DataFrame) -> DataFrame:
 
-        # Convert filtered data to a DataFrame
-        df = DataFrame(filtered_data)
+    # Calculate the differences and daily increments
+    df["diffs"] = df["value"].diff()
+    df["interval"] = df.index.to_series().diff().dt.days
+    df["daily_increments"] = df["diffs"] / df["interval"]
 
-        # Convert 'date' and 'value' columns to datetime and float respectively
-        df["date"] = to_datetime(df["date"])
-        df["value"] = df["value"].astype(float)
+    # Resample to daily frequency, backward filling the values
+    increments = df["daily_increments"].resample("D").asfreq().bfill()
+    increments.iloc[0] = np.nan
 
-        # Set 'date' as index
-        df.set_index("date", inplace=True)
+    # Resample the DataFrame to daily frequency
+    df_daily = df.resample("D").asfreq()
+    df_daily.iloc[1:] = np.nan
 
-        # Resample into daily time series and back fill values
-        df_daily = df.resample("D").asfreq().bfill()
+    # Fill the NaN values in df_daily['value'] with the corresponding values in increments
+    df_daily["value"] = df_daily["value"].fillna(increments)
 
-        # Convert the series back to a list of dictionaries
-        transformed_data = df_daily.reset_index().to_dict("records")
+    # Get the cumulative sum of the values
+    df_daily["value"] = df_daily["value"].cumsum()
 
-        # Append transformed data to result
-        result.extend(transformed_data)
+    # Forward fill the other columns
+    df_daily = df_daily.ffill()
 
-    return result
+    # Drop unnecessary columns
+    return df_daily.drop(columns=["diffs", "interval", "daily_increments"])
 
 
-def interpolate_data(
-    data: List[Dict[str, str | int | float]],
-    method: str,
-) -> List[Dict[str, str | int | float]]:
+def _backfill_series(df: DataFrame) -> DataFrame:
 
-    # Get unique series_id values
-    series_ids = set(item["series_id"] for item in data)
+    # Resample into daily time series and back fill values
+    return df.resample("D").asfreq().bfill()
 
-    result = []
-    for series_id in series_ids:
 
-        # Filter data for current series_id
-        filtered_data = [item for item in data if item["series_id"] == series_id]
+def _interpolate_series(df: DataFrame, method: str) -> DataFrame:
 
-        # Convert the data to a DataFrame
-        df = DataFrame(filtered_data)
-        df["date"] = to_datetime(df["date"])
-        df["value"] = df["value"].astype(float)
-        df.set_index("date", inplace=True)
+    # Resample the data to fill in missing days
+    df_daily = df.resample("D").asfreq()
 
-        # Resample the data to fill in missing days
-        df_daily = df.resample("D").asfreq()
+    # First fill Nans at either end of series
+    # TODO: Not the most preferable way to deal with nans
+    df_daily["value"] = df_daily["value"].bfill(limit_area="outside")
+    df_daily["value"] = df_daily["value"].ffill(limit_area="outside")
 
-        # First fill Nans at either end of series
-        # TODO: Not the most preferable way to deal with nans
-        df_daily["value"] = df_daily["value"].bfill(limit_area="outside")
-        df_daily["value"] = df_daily["value"].ffill(limit_area="outside")
+    # Interpolate the missing values
+    # TODO: Find way to extrapolate values to fill nans
+    df_daily["value"] = df_daily["value"].interpolate(
+        method=method, limit=91, limit_direction="both"
+    )
 
-        # Interpolate the missing values
-        # TODO: Find way to extrapolate values to fill nans
-        df_daily["value"] = df_daily["value"].interpolate(
-            method=method, limit=91, limit_direction="both"
-        )
+    # Backwards fill the remaining nans
+    df_daily[["series_id", "realtime_start", "realtime_end"]] = df_daily[
+        ["series_id", "realtime_start", "realtime_end"]
+    ].bfill()  # TODO: Not the most preferable way to deal with nans
 
-        # Backwards fill the remaining nans
-        df_daily[["series_id", "realtime_start", "realtime_end"]] = df_daily[
-            ["series_id", "realtime_start", "realtime_end"]
-        ].bfill()  # TODO: Not the most preferable way to deal with nans
+    return df_daily
 
-        # Convert the series back to a list of dictionaries
-        transformed_data = df_daily.reset_index().to_dict("records")
 
-        # Append transformed data to result
-        result.extend(transformed_data)
+# Named daily transforms, any other method name is passed to pandas interpolate
+TRANSFORMS: Dict[str, Callable[[DataFrame], DataFrame]] = {
+    "increment": _increment_series,
+    "backfill": _backfill_series,
+}
 
-    return result
+
+def transform_observations(
+    data: List[Dict[str, str | int | float]] | DataFrame,
+    method: str,
+) -> DataFrame:
+    """
+    Transform observations to daily frequency series by series in a single
+    pass, with a named transform ("increment", "backfill") or any pandas
+    interpolation method ("cubicspline", "linear", ...).
+    """
+    # Build one DataFrame for all series
+    df = DataFrame(data)
+    if df.empty:
+        return df
+    df["date"] = to_datetime(df["date"])
+    df["value"] = df["value"].astype(float)
+
+    transform = TRANSFORMS.get(method, partial(_interpolate_series, method=method))
+
+    # Transform each series group, indexed by date
+    frames = [
+        transform(group.set_index("date").sort_index())
+        for _, group in df.groupby("series_id", sort=False, observed=True)
+    ]
+    return concat(frames).reset_index()
+
+
+def increase_frequency(
+    data: List[Dict[str, str | int | float]] | DataFrame
+) -> DataFrame:
+    return transform_observations(data, "increment")
+
+
+def backwards_fill(data: List[Dict[str, str | int | float]] | DataFrame) -> DataFrame:
+    return transform_observations(data, "backfill")
+
+
+def interpolate_data(
+    data: List[Dict[str, str | int | float]] | DataFrame,
+    method: str,
+) -> DataFrame:
+    return transform_observations(data, method)
 
 
 def recombine_data(
@@ -0,0 +1,82 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import numpy as np
+
+from typing import List, Sequence
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Repeated labels are dictionary encoded, so each is sent once per payload
+LABEL = pa.dictionary(pa.int32(), pa.string())
+
+OBSERVATIONS_SCHEMA = pa.schema(
+    [
+        ("series_id", LABEL),
+        ("realtime_start", pa.date32()),
+        ("realtime_end", pa.date32()),
+        ("date", pa.date32()),
+        ("value", pa.float64()),
+    ]
+)
+
+PREDICTIONS_SCHEMA = pa.schema(
+    [
+        ("series_id", LABEL),
+        ("model", LABEL),
+        ("date", pa.date32()),
+        ("value", pa.float64()),
+    ]
+)
+
+
+def rows_to_table(rows: Sequence[tuple], schema: pa.Schema) -> pa.Table:
+    """
+    Transpose query result rows into typed Arrow columns, in schema order.
+    """
+    columns = list(zip(*rows)) or [()] * len(schema)
+    return pa.Table.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def wide_table(rows: Sequence[tuple], series_ids: List[str]) -> pa.Table:
+    """
+    Date-aligned wide table from (date, series_id, value) rows in any order,
+    one float column per requested series with nulls where a series has no
+    value, the shape pivot_data produces.
+    """
+    columns = list(zip(*rows)) or [(), (), ()]
+    dates, inverse = np.unique(
+        np.array(columns[0], dtype="datetime64[D]"), return_inverse=True
+    )
+    positions = {series_id: i for i, series_id in enumerate(series_ids)}
+    values = np.full((len(dates), len(series_ids)), np.nan)
+    values[inverse, [positions[series_id] for series_id in columns[1]]] = np.array(
+        columns[2], dtype=float
+    )
+    return pa.table(
+        {
+            "date": pa.array(dates, type=pa.date32()),
+            **{
+                series_id: pa.array(values[:, i], from_pandas=True)
+                for i, series_id in enumerate(series_ids)
+            },
+        }
+    )
+
+
+def encode_table(table: pa.Table, media_type: str) -> bytes:
+    """
+    Serialize a table as an Arrow IPC stream or a Parquet file.
+    """
+    sink = pa.BufferOutputStream()
+    if media_type == ARROW_MEDIA_TYPE:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif media_type == PARQUET_MEDIA_TYPE:
+        pq.write_table(table, sink)
+    else:
+        raise ValueError(f"Unsupported media type: {media_type}")
+    return sink.getvalue().to_pybytes()
@@ -1,3 +1,5 @@
+import os
+
 # FRED base URL
 BASE_URL = "https://api.stlouisfed.org/fred"
 
@@ -5,6 +7,74 @@ BASE_URL = "https://api.stlouisfed.org/fred"
 SERIES_ENDPOINT = "series"
 OBSERVATIONS_ENDPOINT = f"{SERIES_ENDPOINT}/observations"
 
+# FRED client, API quota is 120 requests per minute
+FRED_REQUESTS_PER_MINUTE = 120
+FRED_MAX_CONCURRENCY = 10
+FRED_MAX_RETRIES = 5
+FRED_BACKOFF_BASE = 0.5  # seconds, doubled on each retry
+FRED_TIMEOUT = 30  # seconds per request
+
+# On-disk FRED response cache
+CACHE_DIR = os.getenv("FRED_CACHE_DIR", ".cache/fred")
+CACHE_TTL = 12 * 60 * 60  # seconds, below the nightly refresh interval
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Augmented Dickey-Fuller settings and on-disk cache of p-values
+ADF_SETTINGS = {"maxlag": None, "regression": "ctt", "autolag": "AIC"}
+ADF_CACHE_DIR = os.getenv("ADF_CACHE_DIR", ".cache/adf")
+ADF_CACHE_MAX_FILES = 5_000  # most recently used p-values kept on disk
+
+# Cointegration rank, lag order and VECM settings, part of the fitted model cache key
+COINT_RANK_SETTINGS = {"det_order": 0, "k_ar_diff": 1, "method": "trace", "signif": 0.05}
+LAG_ORDER_SETTINGS = {"maxlags": 15, "deterministic": "cili", "seasons": 4}
+VECM_SETTINGS = {"deterministic": "cili", "seasons": 0, "first_season": 0}
+
+# On-disk cache of fitted VECM results
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", ".cache/models")
+MODEL_CACHE_MAX_FILES = 50  # most recently used fitted models kept on disk
+
+# Start of requested history, about 10 years of data
+OBSERVATION_START = "2014-12-01"
+
+# Days of stored history re-requested on incremental refresh, gives
+# interpolation a prior anchor and picks up recent FRED revisions
+INCREMENTAL_LOOKBACK_DAYS = 120
+
+# Data API paging and streaming
+MAX_PAGE_SIZE = 10_000
+STREAM_CHUNK_SIZE = 5_000
+MAX_FRAME_SERIES = 50  # series per /frame request
+
+# Points per series kept by each LTTB downsampling level, built at ingest
+PYRAMID_LEVELS = (250, 500, 1000, 2000)
+
+# In-process API response cache
+ROUTE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+ROUTE_CACHE_GENERATION_TTL = 1.0  # seconds between ingest generation checks
+
+# Async database pool serving the API routes, per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+
+# Histogram buckets in seconds for route, query and pipeline stage timings
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# JSON report of stage timings written by each main.py run
+RUN_REPORT_DIR = os.getenv("RUN_REPORT_DIR", ".cache/reports")
+
+# Rows sent to the database per COPY/executemany batch during ingest
+BULK_CHUNK_SIZE = 50_000
+
+# Rows decoded per server-side cursor chunk when loading analysis data
+LOAD_CHUNK_SIZE = 50_000
+
+# Observation and forecast dates accepted at ingest, inclusive
+VALID_DATE_RANGE = ("1776-01-01", "2199-12-31")
+
+# Wide date x series snapshot of observations, written at ingest and read by the analysis
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", ".cache/snapshot/observations.arrow")
+
 SERIES_IDS = [
     # Macro data
     "RRPONTSYD",  # ✅ Overnight Reverse Repurchase Agreements: Treasury Securities Sold by the Federal Reserve in the Temporary Open Market Operations
@@ -52,3 +122,20 @@ CRYPTOCURRENCY_SERIES = [
     "UNRATE",
     "T5YIE",
 ]
+
+
+# Model groups forecast by the pipeline, run in parallel processes
+MODELS = {
+    "semiconductor": SEMICONDUCTOR_SERIES,
+    "cryptocurrency": CRYPTOCURRENCY_SERIES,
+}
+
+FORECAST_STEPS = 365  # adjust steps for forecast length
+
+# Completed forecast runs kept per model when pruning, older runs are deleted
+RUNS_KEPT = 3
+
+# Rolling-origin backtest, origins are step days apart and ending horizon days before the last date
+BACKTEST_ORIGINS = 50
+BACKTEST_HORIZON = 30
+BACKTEST_STEP = 7
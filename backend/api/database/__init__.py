@@ -1,11 +1,40 @@
 # database/__init__.py
 from .base_models import BaseSeries, BaseObservations, BasePredictions
-from .models import Series, Observations, Predictions, Base
+from .validation import validate_batch, BatchValidationError
+from .models import (
+    Series,
+    Observations,
+    Predictions,
+    Runs,
+    PublishedRuns,
+    Pyramids,
+    Generations,
+    Base,
+)
 from .db_utils import (
     populate_series,
     populate_observations,
     create_tables,
     get_db,
     fetch_observations,
+    load_observations,
+    create_run,
     populate_predictions,
+    published_run,
+    publish_run,
+    prune_runs,
+    bulk_insert,
+    get_sync_state,
+    populate_pyramids,
+    get_generation,
+    bump_generation,
+)
+from .async_db_utils import (
+    get_async_engine,
+    dispose_async_engine,
+    get_async_db,
+    fetch_rows,
+    fetch_exists,
+    stream_rows,
+    get_async_generation,
 )
@@ -0,0 +1,135 @@
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.engine import Row, URL, make_url
+from sqlalchemy import Select
+
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, List
+import os
+
+from .models import Generations
+from .db_utils import INGEST_GENERATION
+from ..config import DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT
+from ..metrics import instrument_engine
+
+# Async drivers used in place of the sync drivers of DATABASE_URL
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+# Query parameters asyncpg accepts as connect arguments, libpq-only ones are dropped
+ASYNCPG_QUERY_PARAMS = {"ssl", "target_session_attrs", "prepared_statement_cache_size"}
+
+
+def get_async_url(url: str) -> URL:
+    """
+    Swap the driver of a database URL for its asyncio counterpart. For
+    asyncpg, libpq's sslmode becomes the ssl argument, which takes the same
+    modes, and other libpq query parameters are dropped.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    if backend == "postgresql":
+        query = dict(url.query)
+        if "sslmode" in query:
+            query.setdefault("ssl", query["sslmode"])
+        url = url.set(
+            query={
+                name: value
+                for name, value in query.items()
+                if name in ASYNCPG_QUERY_PARAMS
+            }
+        )
+    return url
+
+
+# Async engine and session factory, created on first use
+_async_engine: AsyncEngine = None
+_async_session_factory: async_sessionmaker = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Create the async database engine serving the API routes on first use,
+    so importing the package does not open a pool.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = get_async_url(os.getenv("DATABASE_URL"))
+
+        # SQLite engines get a NullPool or a single connection pool,
+        # which take no pool sizing arguments
+        pool_options = {}
+        if url.get_backend_name() != "sqlite":
+            pool_options = {
+                "pool_size": DB_POOL_SIZE,
+                "max_overflow": DB_MAX_OVERFLOW,
+                "pool_timeout": DB_POOL_TIMEOUT,
+            }
+        _async_engine = create_async_engine(
+            url, echo=os.getenv("SQL_ECHO") == "1", pool_pre_ping=True, **pool_options
+        )
+
+        # Record statement timings for the metrics endpoint
+        instrument_engine(_async_engine.sync_engine)
+
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine, expire_on_commit=False
+        )
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """
+    Close the pooled connections of the async engine, if it was created.
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
+
+@asynccontextmanager
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+
+async def fetch_rows(statement: Select) -> List[Row]:
+    async with get_async_db() as session:
+        result = await session.execute(statement)
+        return result.all()
+
+
+async def fetch_exists(statement: Select) -> bool:
+    async with get_async_db() as session:
+        result = await session.execute(statement.limit(1))
+        return result.first() is not None
+
+
+async def stream_rows(
+    statement: Select, chunk_size: int
+) -> AsyncGenerator[List[Row], None]:
+    """
+    Yield rows in chunks from a server-side cursor, without blocking the
+    event loop between chunks.
+    """
+    async with get_async_db() as session:
+        result = await session.stream(
+            statement.execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.partitions():
+            yield partition
+
+
+async def get_async_generation() -> int:
+    """
+    Get the ingest generation counter, 0 before the first ingest.
+    """
+    async with get_async_db() as session:
+        generation = await session.get(Generations, INGEST_GENERATION)
+        return generation.value if generation is not None else 0
@@ -1,11 +1,21 @@
 from sqlalchemy.orm import sessionmaker, Session as _Session
-from sqlalchemy.engine import Row
-from sqlalchemy import create_engine
-from pandas import DataFrame
-
-from contextlib import contextmanager
-from typing import Generator, Dict, List, Union
+from sqlalchemy.engine import Row, Connection
+from sqlalchemy.sql.selectable import ScalarSelect
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import create_engine, insert, delete, inspect, func, select, Table
+from pandas import DataFrame, DatetimeIndex, Index
+import numpy as np
 
+from contextlib import contextmanager, nullcontext
+from typing import Any, Generator, Dict, Iterable, List, Tuple
+from datetime import datetime, date, timezone
+from itertools import islice
+from time import perf_counter
+from io import StringIO
+from enum import Enum
+import math
+import csv
 import os
 import sys
 
@@ -20,10 +30,27 @@ from . import (
     Series,
     Observations,
     Predictions,
+    Runs,
+    PublishedRuns,
+    Pyramids,
+    Generations,
 )
+from .validation import validate_batch
+from ..config import BULK_CHUNK_SIZE, LOAD_CHUNK_SIZE, RUNS_KEPT, VALID_DATE_RANGE
+from ..metrics import instrument_engine
+
+# Generation counter bumped by every ingest, read by the API response cache
+INGEST_GENERATION = "ingest"
+
+# Forecast run states, predictions of a run are only read once it completes
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
 
-# Create the database engine, log SQL statements to console
-engine = create_engine(os.getenv("DATABASE_URL"), echo=True)
+# Create the database engine, set SQL_ECHO=1 to log SQL statements to console
+engine = create_engine(os.getenv("DATABASE_URL"), echo=os.getenv("SQL_ECHO") == "1")
+
+# Record statement timings for the metrics endpoint and run report
+instrument_engine(engine)
 
 # Create a session factory class
 SessionFactory = sessionmaker(bind=engine, autocommit=False)
@@ -40,57 +67,487 @@ def get_db() -> Generator[_Session, None, None]:
 
 def create_tables() -> None:
     Base.metadata.create_all(engine)
+    migrate_tables()
+
+
+def migrate_tables() -> None:
+    """
+    Bring tables created before the natural key indexes and forecast runs up
+    to date. Duplicate rows are removed, keeping the latest insert, before each
+    unique index is built.
+    """
+    inspector = inspect(engine)
+
+    # Predictions stored before run versioning belong to no run and are never
+    # read, their model-wide unique index would reject a second run
+    columns = {column["name"] for column in inspector.get_columns("predictions")}
+    if "run_id" not in columns:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "DROP INDEX IF EXISTS uq_predictions_series_id_model_date"
+            )
+            connection.exec_driver_sql("DELETE FROM predictions")
+            connection.exec_driver_sql(
+                "ALTER TABLE predictions ADD COLUMN run_id INTEGER REFERENCES runs (id)"
+            )
+            bump_generation(connection)
+        inspector = inspect(engine)
+
+    for table in (Observations.__table__, Predictions.__table__):
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            with engine.begin() as connection:
+                if index.unique:
+                    keys = ", ".join(column.name for column in index.columns)
+                    connection.exec_driver_sql(
+                        f"DELETE FROM {table.name} WHERE id NOT IN "
+                        f"(SELECT MAX(id) FROM {table.name} GROUP BY {keys})"
+                    )
+                index.create(connection)
 
 
 def populate_series(
     series_data: List[Dict[str, str | int | float]], transformed_series: List[str]
 ) -> None:
+    df = DataFrame(series_data)
+    if not df.empty:
+        df["is_transformed"] = df["id"].isin(transformed_series)
+
+    # Upsert on primary key so reruns refresh metadata instead of failing
+    bulk_insert(
+        Series.__table__, validate_batch(df, BaseSeries), conflict_keys=["id"]
+    )
+
+
+def get_generation() -> int:
+    """
+    Get the ingest generation counter, 0 before the first ingest.
+    """
     with get_db() as session:
-        for data in series_data:
-            series_model = BaseSeries.model_validate(data)
-            if data.get("id") in transformed_series:
-                series_model.is_transformed = True
-            series = Series(**series_model.model_dump())
-            session.add(series)
-        session.commit()
+        generation = session.get(Generations, INGEST_GENERATION)
+        return generation.value if generation is not None else 0
 
 
-def generate_observations(
-    observation_data: List[Dict[str, str | int | float]]
-) -> Generator[Observations, None, None]:
-    for data in observation_data:
-        observation_model = BaseObservations.model_validate(data)
-        yield Observations(**observation_model.model_dump())
+def bump_generation(connection: Connection) -> None:
+    """
+    Increment the ingest generation counter within the caller's transaction.
+    """
+    statement = _dialect_insert(Generations.__table__).values(
+        name=INGEST_GENERATION, value=1
+    )
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"value": Generations.__table__.c.value + 1},
+        )
+    )
 
 
-def populate_observations(observation_data: List[Dict[str, str | int | float]]) -> None:
+def get_sync_state() -> Dict[str, Tuple[datetime, date]]:
+    """
+    Get stored last_updated and latest observation date for each series.
+    last_updated is stored as naive UTC and returned timezone aware.
+    """
     with get_db() as session:
-        for observation in generate_observations(observation_data):
-            session.add(observation)
-        session.commit()
+        data = (
+            session.query(Series.id, Series.last_updated, func.max(Observations.date))
+            .outerjoin(Observations, Observations.series_id == Series.id)
+            .group_by(Series.id, Series.last_updated)
+            .all()
+        )
+
+    return {
+        series_id: (
+            last_updated.replace(tzinfo=timezone.utc) if last_updated else None,
+            last_date,
+        )
+        for series_id, last_updated, last_date in data
+    }
+
+
+def _format_copy_value(value: Any) -> Any:
+    # COPY ... CSV reads an unquoted empty field as NULL
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _copy_chunk(
+    connection: Connection,
+    table_name: str,
+    columns: List[str],
+    rows: List[Tuple[Any, ...]],
+) -> None:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_format_copy_value(value) for value in row])
+    buffer.seek(0)
+
+    # Stream the chunk through the raw psycopg2 cursor of the current transaction
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _copy_upsert(
+    connection: Connection,
+    table: Table,
+    columns: List[str],
+    chunks: Iterable[List[Tuple[Any, ...]]],
+    conflict_keys: List[str],
+) -> int:
+    # COPY into a transaction-scoped staging table, then merge it in one statement
+    staging = f"staging_{table.name}"
+    column_list = ", ".join(columns)
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {table.name} WITH NO DATA"
+    )
+
+    row_count = 0
+    for chunk in chunks:
+        _copy_chunk(connection, staging, columns, chunk)
+        row_count += len(chunk)
+
+    updates = [column for column in columns if column not in conflict_keys]
+    on_conflict = (
+        "DO UPDATE SET "
+        + ", ".join(f"{column} = EXCLUDED.{column}" for column in updates)
+        if updates
+        else "DO NOTHING"
+    )
+    connection.exec_driver_sql(
+        f"INSERT INTO {table.name} ({column_list}) "
+        f"SELECT DISTINCT ON ({', '.join(conflict_keys)}) {column_list} FROM {staging} "
+        f"ON CONFLICT ({', '.join(conflict_keys)}) {on_conflict}"
+    )
+    return row_count
+
+
+def _dialect_insert(table: Table):
+    # PostgreSQL and SQLite share the ON CONFLICT clause API
+    if engine.dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+
+def _insert_statement(table: Table, columns: List[str], conflict_keys: List[str]):
+    if conflict_keys is None:
+        return insert(table)
+
+    statement = _dialect_insert(table)
+    updates = {
+        column: statement.excluded[column]
+        for column in columns
+        if column not in conflict_keys
+    }
+    if not updates:
+        return statement.on_conflict_do_nothing(index_elements=conflict_keys)
+    return statement.on_conflict_do_update(index_elements=conflict_keys, set_=updates)
+
+
+def bulk_insert(
+    table: Table,
+    rows: Iterable[Dict[str, Any]] | Dict[str, List[Any]],
+    chunk_size: int = BULK_CHUNK_SIZE,
+    conflict_keys: List[str] = None,
+    connection: Connection = None,
+) -> int:
+    """
+    Stream rows into table in chunks, with COPY on PostgreSQL and
+    executemany elsewhere, and report ingest throughput. Rows are dicts
+    or columns by name, as validate_batch returns. Rows are upserted on
+    conflict_keys when given. Runs in its own transaction unless an open
+    connection is passed.
+    """
+    columns = [
+        column.name for column in table.columns if column is not table.autoincrement_column
+    ]
+
+    start_time = perf_counter()  # benchmarking
+
+    # Rows as tuples in column order, columnar batches are transposed lazily
+    if isinstance(rows, dict):
+        rows = zip(*(rows[column] for column in columns))
+    else:
+        rows = (tuple(row[column] for column in columns) for row in rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    transaction = engine.begin() if connection is None else nullcontext(connection)
+    with transaction as connection:
+        if engine.dialect.driver == "psycopg2" and conflict_keys is not None:
+            row_count = _copy_upsert(connection, table, columns, chunks, conflict_keys)
+        elif engine.dialect.driver == "psycopg2":
+            row_count = 0
+            for chunk in chunks:
+                _copy_chunk(connection, table.name, columns, chunk)
+                row_count += len(chunk)
+        else:
+            # Multi-row executemany fallback for databases without COPY (e.g. SQLite)
+            statement = _insert_statement(table, columns, conflict_keys)
+            row_count = 0
+            for chunk in chunks:
+                connection.execute(
+                    statement,
+                    [
+                        dict(zip(columns, map(_format_copy_value, row)))
+                        for row in chunk
+                    ],
+                )
+                row_count += len(chunk)
 
+        # Invalidate cached API responses together with the write
+        bump_generation(connection)
 
-def fetch_observations() -> List[Row]:
+    elapsed = perf_counter() - start_time  # benchmarking
+
+    print(
+        f"\nIngested {row_count} rows into {table.name} in {elapsed:.2f} seconds "
+        f"({row_count / elapsed if elapsed else 0:,.0f} rows/sec)\n"
+    )  # benchmarking
+    return row_count
+
+
+def populate_observations(observation_data: DataFrame) -> int:
+    columns = validate_batch(
+        observation_data, BaseObservations, bounds={"date": VALID_DATE_RANGE}
+    )
+    return bulk_insert(
+        Observations.__table__, columns, conflict_keys=["series_id", "date"]
+    )
+
+
+def fetch_observations(series_ids: List[str] = None) -> List[Row]:
     with get_db() as session:
-        data = session.query(
+        query = session.query(
             Observations.date, Observations.series_id, Observations.value
-        ).all()
+        )
+        if series_ids is not None:
+            query = query.filter(Observations.series_id.in_(series_ids))
+        data = query.all()
 
     return data
 
 
-def generate_predictions(df: DataFrame) -> Generator[Predictions, None, None]:
-    for _, row in df.iterrows():
-        observation = row.to_dict()
-        valid_observation = BasePredictions.model_validate(observation)
-        yield Predictions(**valid_observation.model_dump())
+def _filter_observations(
+    statement: Any, series_ids: List[str] = None, start: date = None, end: date = None
+) -> Any:
+    if series_ids is not None:
+        statement = statement.where(Observations.series_id.in_(series_ids))
+    if start is not None:
+        statement = statement.where(Observations.date >= start)
+    if end is not None:
+        statement = statement.where(Observations.date <= end)
+    return statement
 
 
-def populate_predictions(df: DataFrame) -> None:
-    with get_db() as session:
-        for prediction in generate_predictions(df):
-            session.add(prediction)
-        session.commit()
+def load_observations(
+    series_ids: List[str] = None,
+    start: date = None,
+    end: date = None,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+) -> DataFrame:
+    """
+    Load observations as a date-indexed float frame with series as columns,
+    the frame pivot_data builds from fetch_observations. Rows are streamed
+    through a server-side cursor and decoded chunk by chunk into a
+    preallocated matrix, so peak memory is one chunk plus the result.
+    """
+    with engine.connect() as connection:
+        # Series and date bounds size the matrix before any row is read
+        bounds = connection.execute(
+            _filter_observations(
+                select(
+                    Observations.series_id,
+                    func.min(Observations.date),
+                    func.max(Observations.date),
+                ).group_by(Observations.series_id),
+                series_ids,
+                start,
+                end,
+            )
+        ).all()
+        if not bounds:
+            return DataFrame(
+                index=DatetimeIndex([], dtype="datetime64[ns]", name="date"),
+                columns=Index([], dtype=object, name="series_id"),
+                dtype=float,
+            )
+        series = np.array(sorted(series_id for series_id, _, _ in bounds))
+        first = np.datetime64(min(first for _, first, _ in bounds), "D")
+        last = np.datetime64(max(last for _, _, last in bounds), "D")
+        n_days = int((last - first).astype(int)) + 1
+
+        values = np.full((n_days, len(series)), np.nan)
+        present = np.zeros(n_days, dtype=bool)
+
+        result = connection.execution_options(
+            stream_results=True, yield_per=chunk_size
+        ).execute(
+            _filter_observations(
+                select(Observations.date, Observations.series_id, Observations.value),
+                series_ids,
+                start,
+                end,
+            )
+        )
+        # Day offsets and series positions index straight into the matrix
+        first_ordinal = first.astype(object).toordinal()
+        positions = {series_id: i for i, series_id in enumerate(series)}
+        for chunk in result.partitions():
+            dates, chunk_series, chunk_values = zip(*chunk)
+            rows = np.fromiter(map(date.toordinal, dates), int, len(dates))
+            rows -= first_ordinal
+            columns = np.fromiter(map(positions.__getitem__, chunk_series), int)
+            values[rows, columns] = np.array(chunk_values, dtype=float)
+            present[rows] = True
+
+    # Only dates with stored rows, as in the pivoted long table
+    dates = np.arange(first, last + 1)
+    if not present.all():
+        dates, values = dates[present], values[present]
+    return DataFrame(
+        values,
+        index=DatetimeIndex(dates.astype("datetime64[ns]"), name="date"),
+        columns=Index(series, dtype=object, name="series_id"),
+    )
+
+
+def create_run(model: str, steps: int, observation_end: date) -> int:
+    """
+    Register a forecast run of model, its predictions stay hidden from
+    readers until the run is published.
+    """
+    with engine.begin() as connection:
+        return connection.execute(
+            insert(Runs)
+            .values(
+                model=model,
+                status=RUN_RUNNING,
+                started_at=datetime.now(timezone.utc),
+                steps=steps,
+                observation_end=observation_end,
+            )
+            .returning(Runs.id)
+        ).scalar_one()
+
+
+def populate_predictions(df: DataFrame, run_id: int) -> int:
+    columns = validate_batch(df, BasePredictions, bounds={"date": VALID_DATE_RANGE})
+    columns["run_id"] = [run_id] * len(df)
+
+    # Each run only inserts new keys, no conflict handling needed
+    return bulk_insert(Predictions.__table__, columns)
+
+
+def published_run(model: str) -> ScalarSelect:
+    """
+    Subquery of the published run id of model, readers filter predictions
+    on it so a single statement never mixes two runs.
+    """
+    return (
+        select(PublishedRuns.run_id)
+        .where(PublishedRuns.model == model)
+        .scalar_subquery()
+    )
+
+
+def publish_run(run_id: int, row_count: int, df_pyramids: DataFrame = None) -> int:
+    """
+    Make run_id the run readers see for its model, together with the
+    pyramids of its forecast, in one transaction. Returns the pyramid rows.
+    """
+    with engine.begin() as connection:
+        model = connection.execute(
+            select(Runs.model).where(Runs.id == run_id)
+        ).scalar_one()
+        pyramid_rows = 0
+        if df_pyramids is not None:
+            pyramid_rows = populate_pyramids(df_pyramids, model, connection=connection)
+        connection.execute(
+            Runs.__table__.update()
+            .where(Runs.id == run_id)
+            .values(
+                status=RUN_COMPLETED,
+                completed_at=datetime.now(timezone.utc),
+                row_count=row_count,
+            )
+        )
+        # Swap the pointer, readers switch runs when this transaction commits
+        statement = _dialect_insert(PublishedRuns.__table__).values(
+            model=model, run_id=run_id
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=["model"], set_={"run_id": run_id}
+            )
+        )
+        bump_generation(connection)
+    return pyramid_rows
+
+
+def prune_runs(keep: int = RUNS_KEPT) -> int:
+    """
+    Delete the runs of each model older than its keep latest completed
+    runs, with their predictions. Returns the deleted prediction rows.
+    """
+    row_count = 0
+    with engine.begin() as connection:
+        for model, run_id in connection.execute(
+            select(PublishedRuns.model, PublishedRuns.run_id)
+        ).all():
+            completed = (
+                connection.execute(
+                    select(Runs.id)
+                    .where(Runs.model == model, Runs.status == RUN_COMPLETED)
+                    .order_by(Runs.id.desc())
+                    .limit(keep)
+                )
+                .scalars()
+                .all()
+            )
+            # Never prune the published run, nor runs started after the oldest kept one
+            cutoff = min(completed + [run_id])
+            stale = select(Runs.id).where(Runs.model == model, Runs.id < cutoff)
+            row_count += connection.execute(
+                delete(Predictions).where(Predictions.run_id.in_(stale))
+            ).rowcount
+            connection.execute(
+                delete(Runs).where(Runs.model == model, Runs.id < cutoff)
+            )
+    return row_count
+
+
+def populate_pyramids(df: DataFrame, source: str, connection: Connection = None) -> int:
+    """
+    Replace the downsampling pyramids of the series in df for source,
+    "observations" or a model name, in one transaction so readers never
+    see a partial level. The caller's transaction is used when given.
+    """
+    series_ids = df["series_id"].unique().tolist()
+    rows = (
+        {"series_id": series_id, "source": source, "level": level, "date": day}
+        for series_id, level, day in zip(
+            df["series_id"], df["level"].tolist(), df["date"].dt.date
+        )
+    )
+    transaction = engine.begin() if connection is None else nullcontext(connection)
+    with transaction as connection:
+        connection.execute(
+            delete(Pyramids).where(
+                Pyramids.series_id.in_(series_ids), Pyramids.source == source
+            )
+        )
+        return bulk_insert(Pyramids.__table__, rows, connection=connection)
 
 
 def get_gdp_per_capita() -> None:
@@ -8,6 +8,7 @@ from sqlalchemy import (
     ForeignKey,
     Date,
     Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import declarative_base
@@ -45,6 +46,10 @@ class Series(Base):
 
 class Observations(Base):
     __tablename__ = "observations"
+    __table_args__ = (
+        # Natural key for upserts, also serves (series_id, date) range queries
+        Index("uq_observations_series_id_date", "series_id", "date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     series_id = Column(String, ForeignKey("series.id"))
@@ -58,15 +63,88 @@ class Observations(Base):
         return f"<Observations(series_id={self.series_id}, date={self.date}, value={self.value})>"
     
 
+class Runs(Base):
+    __tablename__ = "runs"
+
+    id = Column(Integer, primary_key=True)
+    model = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # "running" until published, then "completed"
+    started_at = Column(DateTime, nullable=False)  # UTC, as is Series.last_updated
+    completed_at = Column(DateTime, nullable=True)
+    steps = Column(Integer)
+    observation_end = Column(Date)  # last observed date the forecast starts after
+    row_count = Column(Integer, nullable=True)
+    predictions = relationship("Predictions", back_populates="run")
+
+    def __repr__(self):
+        return f"<Runs(id={self.id}, model={self.model}, status={self.status})>"
+
+
+class PublishedRuns(Base):
+    __tablename__ = "published_runs"
+
+    model = Column(String, primary_key=True)
+    run_id = Column(Integer, ForeignKey("runs.id"), nullable=False)
+
+    def __repr__(self):
+        return f"<PublishedRuns(model={self.model}, run_id={self.run_id})>"
+
+
 class Predictions(Base):
     __tablename__ = "predictions"
-    
+    __table_args__ = (
+        # Natural key of a forecast run, also serves (run_id, series_id, date) range queries
+        Index(
+            "uq_predictions_run_id_series_id_date",
+            "run_id",
+            "series_id",
+            "date",
+            unique=True,
+        ),
+    )
+
     id = Column(Integer, primary_key=True)
+    run_id = Column(Integer, ForeignKey("runs.id"))
     series_id = Column(String, ForeignKey("series.id"))
     model = Column(String)
     date = Column(Date)
     value = Column(Float)
     series = relationship("Series", back_populates="predictions")
-    
+    run = relationship("Runs", back_populates="predictions")
+
+    def __repr__(self):
+        return f"<Predictions(run_id={self.run_id}, series_id={self.series_id}, model={self.model}, date={self.date}, value={self.value})>"
+
+
+class Pyramids(Base):
+    __tablename__ = "pyramids"
+    __table_args__ = (
+        # Dates kept per level, joined back to observations or predictions
+        Index(
+            "uq_pyramids_series_id_source_level_date",
+            "series_id",
+            "source",
+            "level",
+            "date",
+            unique=True,
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    series_id = Column(String, ForeignKey("series.id"))
+    source = Column(String)  # "observations" or the model of predictions
+    level = Column(Integer)
+    date = Column(Date)
+
+    def __repr__(self):
+        return f"<Pyramids(series_id={self.series_id}, source={self.source}, level={self.level}, date={self.date})>"
+
+
+class Generations(Base):
+    __tablename__ = "generations"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
     def __repr__(self):
-        return f"<Predictions(series_id={self.series_id}, model={self.model}, date={self.date}, value={self.value})>"
+        return f"<Generations(name={self.name}, value={self.value})>"
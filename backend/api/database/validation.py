@@ -0,0 +1,194 @@
+# validation.py
+from pydantic import BaseModel
+from pandas import DataFrame, Series, CategoricalDtype, to_numeric
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_string_dtype
+import numpy as np
+
+from typing import Any, Callable, Dict, List, Tuple, Type, Union, get_args, get_origin
+from datetime import datetime, date
+from enum import Enum
+import types
+
+# Row positions listed per column in error messages, the rest are counted
+MAX_REPORTED_ROWS = 10
+
+
+class BatchValidationError(ValueError):
+    """
+    Rows of a batch failing validation, as row positions per (column, check).
+    """
+
+    def __init__(self, model: str, errors: Dict[Tuple[str, str], List[int]]) -> None:
+        self.errors = errors
+        details = []
+        for (column, check), rows in errors.items():
+            detail = f"{column} {check} at rows {rows[:MAX_REPORTED_ROWS]}"
+            if len(rows) > MAX_REPORTED_ROWS:
+                detail += f" and {len(rows) - MAX_REPORTED_ROWS} more"
+            details.append(detail)
+        super().__init__(f"Invalid {model} batch: {'; '.join(details)}")
+
+
+def _field_type(annotation: Any) -> Tuple[type, bool]:
+    # Optional[X] and X | None are a nullable X
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return args[0], len(args) < len(get_args(annotation))
+    return annotation, False
+
+
+def _check_elements(column: Series, check: Callable[[Any], bool]) -> np.ndarray:
+    # Fallback for object columns, one call per value
+    return ~np.fromiter(map(check, column.to_numpy(dtype=object)), bool, len(column))
+
+
+def _check_str(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if isinstance(column.dtype, CategoricalDtype):
+        # Categories are checked once instead of every row
+        categories = column.cat.categories.to_numpy(dtype=object)
+        if all(isinstance(category, str) for category in categories):
+            invalid = np.zeros(len(column), dtype=bool)
+        else:
+            invalid = _check_elements(column, lambda value: isinstance(value, str))
+    elif is_string_dtype(column.dtype) and column.dtype != object:
+        invalid = np.zeros(len(column), dtype=bool)
+    else:
+        invalid = _check_elements(column, lambda value: isinstance(value, str))
+    return column.to_numpy(dtype=object), invalid & ~null
+
+
+def _check_float(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    values = to_numeric(column, errors="coerce").to_numpy(dtype=float)
+    return values, np.isnan(values) & ~null
+
+
+def _check_int(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    values, invalid = _check_float(column, null)
+    invalid |= (values % 1 != 0) & ~null
+    integers = np.where(invalid | null, 0, values).astype(np.int64).astype(object)
+    return integers, invalid
+
+
+def _check_bool(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if is_bool_dtype(column.dtype):
+        invalid = np.zeros(len(column), dtype=bool)
+    else:
+        invalid = ~column.isin([True, False]).to_numpy()
+    return column.to_numpy(dtype=object).astype(bool).astype(object), invalid & ~null
+
+
+def _is_day(value: Any) -> bool:
+    if isinstance(value, datetime):
+        return value.time() == datetime.min.time()
+    if isinstance(value, str):
+        try:
+            date.fromisoformat(value)
+        except ValueError:
+            return False
+        return True
+    return isinstance(value, date)
+
+
+def _check_date(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if is_datetime64_any_dtype(column.dtype):
+        # Dates with a time of day are rejected as they would be truncated
+        values = column.to_numpy()
+        days = values.astype("datetime64[D]")
+        return days, (days != values) & ~null
+
+    invalid = _check_elements(column, _is_day) & ~null
+    values = column.to_numpy(dtype=object).copy()
+    values[invalid | null] = None
+    return values.astype("datetime64[D]"), invalid
+
+
+def _check_datetime(column: Series, null: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if is_datetime64_any_dtype(column.dtype):
+        return column.to_numpy(dtype=object), np.zeros(len(column), dtype=bool)
+
+    def is_datetime(value: Any) -> bool:
+        if isinstance(value, str):
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                return False
+            return True
+        return isinstance(value, datetime)
+
+    return column.to_numpy(dtype=object), _check_elements(column, is_datetime) & ~null
+
+
+def _check_enum(
+    enum: Type[Enum], column: Series, null: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    allowed = [member.value for member in enum]
+    invalid = ~column.isin(allowed).to_numpy() & ~null
+    return column.to_numpy(dtype=object), invalid
+
+
+CHECKS = {
+    str: _check_str,
+    float: _check_float,
+    int: _check_int,
+    bool: _check_bool,
+    date: _check_date,
+    datetime: _check_datetime,
+}
+
+
+def validate_batch(
+    df: DataFrame,
+    model: Type[BaseModel],
+    bounds: Dict[str, Tuple[str, str]] = None,
+) -> Dict[str, List[Any]]:
+    """
+    Validate a frame against the fields of a pydantic model a whole column
+    at a time, checking type, nullability, enum membership and the
+    inclusive date bounds of the columns in bounds. Returns the validated
+    columns, ready for bulk_insert, and raises BatchValidationError with
+    the offending row positions otherwise.
+    """
+    bounds = bounds or {}
+    n_rows = len(df)
+    errors = {}
+    columns = {}
+    for name, field in model.model_fields.items():
+        field_type, nullable = _field_type(field.annotation)
+
+        # Absent optional columns take the field default
+        if name not in df:
+            if field.is_required() and n_rows:
+                errors[(name, "missing")] = list(range(n_rows))
+            columns[name] = [field.get_default()] * n_rows
+            continue
+
+        column = df[name].reset_index(drop=True)
+        null = column.isna().to_numpy()
+        if not nullable and null.any():
+            errors[(name, "null")] = np.flatnonzero(null).tolist()
+
+        if isinstance(field_type, type) and issubclass(field_type, Enum):
+            values, invalid = _check_enum(field_type, column, null)
+        else:
+            values, invalid = CHECKS[field_type](column, null)
+        if invalid.any():
+            errors[(name, f"not {field_type.__name__}")] = np.flatnonzero(
+                invalid
+            ).tolist()
+
+        if name in bounds:
+            lower, upper = (np.datetime64(bound, "D") for bound in bounds[name])
+            out_of_bounds = ((values < lower) | (values > upper)) & ~(invalid | null)
+            if out_of_bounds.any():
+                errors[(name, "out of bounds")] = np.flatnonzero(
+                    out_of_bounds
+                ).tolist()
+
+        # Missing values are written as NULL
+        if values.dtype == object:
+            values[null] = None
+        columns[name] = values.tolist()
+
+    if errors:
+        raise BatchValidationError(model.__name__, errors)
+    return columns
@@ -0,0 +1,97 @@
+from pandas import DataFrame, concat
+import numpy as np
+
+from typing import List, Sequence, Tuple
+
+from .config import PYRAMID_LEVELS
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the Largest-Triangle-Three-Buckets selection of threshold
+    points from sorted x, keeping the first and last point. Each bucket keeps
+    the point forming the largest triangle with the previously kept point
+    and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold <= 2:
+        return np.array([0, n - 1])[:threshold]
+
+    # Bucket edges over the points between the first and the last
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    # Average of each bucket, the last point acts as the final next bucket
+    counts = np.diff(edges)
+    average_x = np.append(np.add.reduceat(x[:-1], edges[:-1]) / counts, x[-1])
+    average_y = np.append(np.add.reduceat(y[:-1], edges[:-1]) / counts, y[-1])
+
+    # The kept point depends on the previous one, so the scan runs in plain
+    # Python over floats, faster than numpy on buckets of a few points
+    xs, ys = x.tolist(), y.tolist()
+    average_x, average_y = average_x.tolist(), average_y.tolist()
+    edges = edges.tolist()
+
+    indices = [0]
+    a = 0
+    for bucket in range(threshold - 2):
+        x_a, y_a = xs[a], ys[a]
+        dx = x_a - average_x[bucket + 1]
+        dy = average_y[bucket + 1] - y_a
+        max_area = -1.0
+        for i in range(edges[bucket], edges[bucket + 1]):
+            area = abs(dx * (ys[i] - y_a) - (x_a - xs[i]) * dy)
+            if area > max_area:
+                max_area, selected = area, i
+        a = selected
+        indices.append(a)
+    indices.append(n - 1)
+    return np.array(indices)
+
+
+def pyramid_level(points: int, levels: Tuple[int, ...] = PYRAMID_LEVELS) -> int:
+    """
+    Largest precomputed level that fits in points, None below the smallest.
+    """
+    fitting = [level for level in levels if level <= points]
+    return max(fitting) if fitting else None
+
+
+def build_pyramids(
+    df: DataFrame, levels: Tuple[int, ...] = PYRAMID_LEVELS
+) -> DataFrame:
+    """
+    Dates kept by LTTB at each level for every series of a long
+    [series_id, date, value] frame. Series shorter than a level keep all
+    their dates, so every level exists for every series.
+    """
+    pyramids = []
+    for series_id, df_series in df.dropna(subset=["value"]).groupby(
+        "series_id", sort=False, observed=True
+    ):
+        df_series = df_series.sort_values("date")
+        dates = df_series["date"].to_numpy(dtype="datetime64[D]")
+        x = dates.astype(np.int64).astype(float)
+        y = df_series["value"].to_numpy(dtype=float)
+        for level in levels:
+            kept = dates[lttb(x, y, level)]
+            pyramids.append(
+                DataFrame({"series_id": series_id, "level": level, "date": kept})
+            )
+    if not pyramids:
+        return DataFrame(columns=["series_id", "level", "date"])
+    return concat(pyramids, ignore_index=True)
+
+
+def downsample_rows(rows: Sequence, points: int) -> List:
+    """
+    LTTB selection of at most points result rows with date and value
+    attributes, for ranges without a precomputed pyramid. Rows without
+    a value are dropped.
+    """
+    rows = [row for row in rows if row.value is not None]
+    x = np.array([row.date.toordinal() for row in rows], dtype=float)
+    y = np.array([row.value for row in rows], dtype=float)
+    return [rows[i] for i in lttb(x, y, points)]
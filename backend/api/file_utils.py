@@ -0,0 +1,36 @@
+from pathlib import Path
+import os
+
+
+def atomic_write_bytes(path: str | Path, data: bytes) -> None:
+    """
+    Write data to path through a temporary file swapped in with os.replace,
+    so readers, including other processes sharing the directory, never see
+    a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        temporary_path.write_bytes(data)
+        os.replace(temporary_path, path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def prune_files(directory: str | Path, pattern: str, keep: int) -> int:
+    """
+    Delete all but the keep most recently modified files matching pattern,
+    returns the number of files deleted. Readers touch files they reuse,
+    so the least recently used go first.
+    """
+    paths = []
+    for path in Path(directory).glob(pattern):
+        try:
+            paths.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    paths.sort(reverse=True)
+    for _, path in paths[keep:]:
+        path.unlink(missing_ok=True)
+    return max(len(paths) - keep, 0)
@@ -0,0 +1,180 @@
+from aiohttp import ClientSession, ClientError, ClientTimeout, TCPConnector
+from urllib.parse import urlparse, parse_qs
+
+from typing import Dict, List, Tuple
+from time import monotonic, perf_counter
+from statistics import mean, quantiles
+import asyncio
+import random
+
+from .config import (
+    FRED_REQUESTS_PER_MINUTE,
+    FRED_MAX_CONCURRENCY,
+    FRED_MAX_RETRIES,
+    FRED_BACKOFF_BASE,
+    FRED_TIMEOUT,
+)
+from .response_cache import ResponseCache
+
+# Status codes worth retrying, rate limited or transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter, refills at rate tokens per second up to capacity.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RequestStats:
+    """
+    Per-request latency and retry bookkeeping for a FredClient.
+    """
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.retries = 0
+        self.failures = 0
+
+    def summary(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        if len(latencies) > 1:
+            percentiles = quantiles(latencies, n=100, method="inclusive")
+            p50, p95 = percentiles[49], percentiles[94]
+        else:
+            p50 = p95 = latencies[0] if latencies else 0.0
+        return {
+            "requests": len(latencies),
+            "retries": self.retries,
+            "failures": self.failures,
+            "mean": mean(latencies) if latencies else 0.0,
+            "p50": p50,
+            "p95": p95,
+            "max": latencies[-1] if latencies else 0.0,
+        }
+
+
+class FredClient:
+    """
+    Async FRED client sharing one pooled session, with bounded concurrency,
+    a token bucket matching the FRED request quota and exponential backoff
+    on rate limiting and server errors. Successful payloads are served from
+    and stored in the optional response cache. Use as an async context manager.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = FRED_MAX_CONCURRENCY,
+        requests_per_minute: int = FRED_REQUESTS_PER_MINUTE,
+        max_retries: int = FRED_MAX_RETRIES,
+        backoff_base: float = FRED_BACKOFF_BASE,
+        timeout: float = FRED_TIMEOUT,
+        cache: ResponseCache = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = TokenBucket(
+            rate=requests_per_minute / 60, capacity=max_concurrency
+        )
+        self.stats = RequestStats()
+        self.cache = cache
+        self.session: ClientSession = None
+
+    async def __aenter__(self) -> "FredClient":
+        self.session = ClientSession(
+            connector=TCPConnector(limit=self.max_concurrency),
+            timeout=ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+        self.session = None
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        # Honour Retry-After when FRED sends it, else exponential with jitter
+        if retry_after is not None and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_base * 2**attempt * (1 + random.random())
+
+    async def get_json(self, url: str, revision: str = None) -> dict:
+        # Uncacheable endpoints are always requested
+        cache = self.cache
+        if cache is not None and not cache.is_cacheable(url):
+            cache = None
+        if cache is not None:
+            payload = cache.get(url, revision)
+            if payload is not None:
+                return payload
+
+        payload = await self._request_json(url)
+        if cache is not None and payload is not None:
+            cache.set(url, payload, revision)
+        return payload
+
+    async def _request_json(self, url: str) -> dict:
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                start_time = perf_counter()
+                try:
+                    async with self.session.get(url) as response:
+                        self.stats.latencies.append(perf_counter() - start_time)
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            return await response.json()
+                        error = f"status code: {response.status}"
+                        delay = self._backoff(
+                            attempt, response.headers.get("Retry-After")
+                        )
+                except (ClientError, asyncio.TimeoutError) as e:
+                    status = getattr(e, "status", None)
+                    if status is not None and status not in RETRY_STATUSES:
+                        self.stats.failures += 1
+                        print(f"Error occurred: {e}, status code: {status}")
+                        return None
+                    error = str(e) or type(e).__name__
+                    delay = self._backoff(attempt)
+
+            if attempt < self.max_retries:
+                self.stats.retries += 1
+                await asyncio.sleep(delay)
+
+        self.stats.failures += 1
+        print(f"Error occurred: {error}, giving up after {self.max_retries} retries")
+        return None
+
+    async def get_payloads(
+        self, urls: List[str], revisions: Dict[str, str] = None
+    ) -> List[Tuple[str, dict]]:
+        # Revisions map series_id to last_updated, revised series bypass the cache
+        revisions = revisions or {}
+        tasks = []
+        for url in urls:
+            series_id = parse_qs(urlparse(url).query).get("series_id", [None])[0]
+            tasks.append(self.get_json(url, revisions.get(series_id)))
+        results = await asyncio.gather(*tasks)
+        return [(url, response) for url, response in zip(urls, results) if response]
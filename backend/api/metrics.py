@@ -0,0 +1,191 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Generator, List, Tuple
+from datetime import datetime, timezone
+from threading import Lock
+from time import perf_counter
+import bisect
+import resource
+import json
+import sys
+import os
+
+from .config import LATENCY_BUCKETS
+
+METRIC_HELP = {
+    "pipeline_stage_seconds": "Duration of ingest and analysis pipeline stages.",
+    "http_request_duration_seconds": "Latency of the data API routes.",
+    "db_query_duration_seconds": "Duration of database statements by operation.",
+}
+
+
+def peak_rss_mb() -> float:
+    # Peak resident set size of the process, in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float:
+    # Resident set size now, from the page count in /proc, None where unavailable
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+@dataclass
+class Span:
+    name: str
+    labels: Dict[str, str] = field(default_factory=dict)
+    seconds: float = None
+    rows: int = None
+    start_rss_mb: float = None
+    end_rss_mb: float = None
+
+
+class Metrics:
+    """
+    Process-wide timing spans and latency histograms, rendered in the
+    Prometheus text format or written as a JSON run report.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List] = {}
+        self.spans: List[Span] = []
+        self.lock = Lock()
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            # Per bucket counts, then sum and count of observations
+            histogram = self.histograms.setdefault(
+                key, [[0] * (len(self.buckets) + 1), 0.0, 0]
+            )
+            histogram[0][bisect.bisect_left(self.buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Generator[Span, None, None]:
+        """
+        Time a pipeline stage, the caller may set span.rows inside the block.
+        """
+        span = Span(name, labels, start_rss_mb=current_rss_mb())
+        start_time = perf_counter()
+        try:
+            yield span
+        finally:
+            span.seconds = perf_counter() - start_time
+            span.end_rss_mb = current_rss_mb()
+            self.add_spans([span])
+
+    def add_spans(self, spans: List[Span]) -> None:
+        for span in spans:
+            self.observe(
+                "pipeline_stage_seconds", span.seconds, stage=span.name, **span.labels
+            )
+        with self.lock:
+            self.spans.extend(spans)
+
+    def drain_spans(self) -> List[Span]:
+        # Hand spans recorded in a worker process back to the parent
+        with self.lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+            self.spans.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        for name in sorted({name for (name, _labels), _ in histograms}):
+            lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), (counts, total, count) in histograms:
+                if metric != name:
+                    continue
+                label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+                cumulative = 0
+                for bound, bucket_count in zip([*self.buckets, "+Inf"], counts):
+                    cumulative += bucket_count
+                    le = f'le="{bound}"'
+                    bucket_labels = f"{label_text},{le}" if label_text else le
+                    lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulative}")
+                lines.append(f"{name}_sum{{{label_text}}} {total}")
+                lines.append(f"{name}_count{{{label_text}}} {count}")
+        lines.append("# HELP process_peak_rss_bytes Peak resident set size.")
+        lines.append("# TYPE process_peak_rss_bytes gauge")
+        lines.append(f"process_peak_rss_bytes {peak_rss_mb() * 1024**2:.0f}")
+        return "\n".join(lines) + "\n"
+
+    def report(self, **extra: Dict) -> Dict:
+        with self.lock:
+            spans = [asdict(span) for span in self.spans]
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "peak_rss_mb": peak_rss_mb(),
+            "spans": spans,
+            **extra,
+        }
+
+    def write_report(self, directory: str, **extra: Dict) -> str:
+        """
+        Write the run report as JSON into directory, named by its timestamp.
+        """
+        report = self.report(**extra)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ.json")
+        )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(report, file, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def format_spans(self) -> str:
+        lines = [
+            f"{'stage':<24}{'seconds':>10}{'rows':>12}{'start MB':>10}{'end MB':>10}"
+        ]
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            name = " ".join([span.name, *span.labels.values()])
+            rows = "" if span.rows is None else f"{span.rows:,}"
+            rss = "".join(
+                f"{'':>10}" if value is None else f"{value:>10.1f}"
+                for value in (span.start_rss_mb, span.end_rss_mb)
+            )
+            lines.append(f"{name:<24}{span.seconds:>10.3f}{rows:>12}{rss}")
+        lines.append(f"process peak RSS {peak_rss_mb():.1f} MB")
+        return "\n".join(lines)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement run on engine, labelled by its SQL operation.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_start_time"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        metrics.observe("db_query_duration_seconds", elapsed, operation=operation)
+
+
+# Process-wide metrics, rendered by the /api/metrics route
+metrics = Metrics()
@@ -0,0 +1,113 @@
+from urllib.parse import urlencode, urlparse, parse_qsl
+
+from typing import Dict
+from pathlib import Path
+from hashlib import sha256
+from time import time
+import gzip
+import json
+import os
+
+from .file_utils import atomic_write_bytes
+from .config import CACHE_DIR, CACHE_TTL, CACHE_MAX_BYTES, SERIES_ENDPOINT
+
+# Query parameters that do not change the response
+IGNORED_PARAMS = {"api_key"}
+
+# Endpoints always requested, series metadata carries the last_updated
+# revisions that decide which cached observations are still valid
+UNCACHED_ENDPOINTS = {SERIES_ENDPOINT}
+
+
+class ResponseCache:
+    """
+    On-disk cache of FRED JSON payloads stored as gzip compressed JSON.
+    Entries expire after ttl seconds, are invalidated when the cached
+    revision (series last_updated) differs from the requested one, and
+    least recently used entries are evicted above max_bytes. Series
+    metadata is never cached, it is what detects revisions.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = CACHE_DIR,
+        ttl: float = CACHE_TTL,
+        max_bytes: int = CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        # Key on endpoint, series_id and sorted query params, never the API key
+        parsed_url = urlparse(url)
+        params = sorted(
+            (name, value)
+            for name, value in parse_qsl(parsed_url.query)
+            if name not in IGNORED_PARAMS
+        )
+        series_id = dict(params).get("series_id", "")
+        digest = sha256(f"{parsed_url.path}?{urlencode(params)}".encode()).hexdigest()
+        return f"{series_id}-{digest[:32]}"
+
+    @staticmethod
+    def is_cacheable(url: str) -> bool:
+        path = urlparse(url).path.rstrip("/")
+        return not any(path.endswith(f"/{endpoint}") for endpoint in UNCACHED_ENDPOINTS)
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{self.key(url)}.json.gz"
+
+    def get(self, url: str, revision: str = None) -> dict:
+        path = self._path(url)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        is_expired = time() - entry["stored_at"] > self.ttl
+        is_stale = revision is not None and entry["revision"] != revision
+        if is_expired or is_stale:
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Touch the file so eviction sees it as recently used
+        os.utime(path)
+        self.hits += 1
+        return entry["payload"]
+
+    def set(self, url: str, payload: dict, revision: str = None) -> None:
+        path = self._path(url)
+        entry = {"stored_at": time(), "revision": revision, "payload": payload}
+
+        atomic_write_bytes(
+            path, gzip.compress(json.dumps(entry, separators=(",", ":")).encode())
+        )
+
+        self.evict()
+
+    def evict(self) -> None:
+        entries = [
+            (path.stat().st_mtime, path.stat().st_size, path)
+            for path in self.directory.glob("*.json.gz")
+        ]
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json.gz"):
+            path.unlink(missing_ok=True)
+
+    def summary(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
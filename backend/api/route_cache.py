@@ -0,0 +1,125 @@
+from fastapi import Request, Response
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Tuple
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+
+from .database import get_async_generation
+from .config import ROUTE_CACHE_MAX_BYTES, ROUTE_CACHE_GENERATION_TTL
+
+
+@dataclass
+class CachedResponse:
+    generation: int
+    etag: str
+    body: bytes
+    media_type: str
+    headers: Dict[str, str]
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+class RouteCache:
+    """
+    In-process LRU cache of serialized API responses, keyed by route and
+    query params, bounded by total body size and invalidated when the
+    ingest generation counter in the database moves on.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = ROUTE_CACHE_MAX_BYTES,
+        generation_ttl: float = ROUTE_CACHE_GENERATION_TTL,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.generation_ttl = generation_ttl
+        self.entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+        self._generation = None
+        self._generation_checked_at = 0.0
+
+    @staticmethod
+    def key(request: Request, *variants: str) -> str:
+        params = sorted(request.query_params.multi_items())
+        return "|".join([request.url.path, str(params), *variants])
+
+    async def generation(self) -> int:
+        # Poll the database counter at most once per generation_ttl seconds
+        now = monotonic()
+        is_stale = now - self._generation_checked_at > self.generation_ttl
+        if self._generation is None or is_stale:
+            self._generation = await get_async_generation()
+            self._generation_checked_at = now
+        return self._generation
+
+    def get(self, key: str, generation: int) -> CachedResponse:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != generation:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: str) -> None:
+        self.size -= len(self.entries.pop(key).body)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    async def respond(
+        self,
+        key: str,
+        build: Callable[[], Awaitable[Tuple[bytes, str, Dict[str, str]]]],
+        if_none_match: str = None,
+    ) -> Response:
+        """
+        Serve the cached response for key, building and caching it on a miss,
+        and answer a matching If-None-Match with 304 Not Modified.
+        """
+        generation = await self.generation()
+        entry = self.get(key, generation)
+        if entry is None:
+            body, media_type, headers = await build()
+            entry = CachedResponse(
+                generation, make_etag(body), body, media_type, headers
+            )
+            self.set(key, entry)
+
+        # Clients may keep the body but must revalidate it with the ETag
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", **entry.headers}
+        if etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=entry.body, media_type=entry.media_type, headers=headers
+        )
+
+
+# Process-wide cache used by the data routes
+route_cache = RouteCache()
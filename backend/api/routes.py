@@ -1,48 +1,487 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import APIRoute
+import pyarrow as pa
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import and_, select, Select
 
-from typing import List
+from datetime import date
+from typing import AsyncGenerator, Callable, Dict, List, Tuple
+from time import perf_counter
+import json
 
 from .database import (
-    get_db,
+    fetch_rows,
+    fetch_exists,
+    stream_rows,
+    published_run,
     BaseObservations,
     BasePredictions,
     Observations,
     Predictions,
+    Pyramids,
+)
+from .api_utils import DateEncoder
+from .config import MAX_PAGE_SIZE, MAX_FRAME_SERIES, STREAM_CHUNK_SIZE
+from .route_cache import route_cache
+from .metrics import metrics
+from .downsample import pyramid_level, downsample_rows
+from .columnar import (
+    ARROW_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    OBSERVATIONS_SCHEMA,
+    PREDICTIONS_SCHEMA,
+    rows_to_table,
+    wide_table,
+    encode_table,
 )
 
-router = APIRouter()
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
+# Columnar formats offered besides JSON, listed in the OpenAPI docs
+COLUMNAR_RESPONSES = {
+    200: {
+        "content": {
+            ARROW_MEDIA_TYPE: {},
+            PARQUET_MEDIA_TYPE: {},
+            NDJSON_MEDIA_TYPE: {},
+        }
+    }
+}
 
-@router.get("/series/{series_id}", response_model=List[BaseObservations])
-async def get_observations(series_id: str) -> List[BaseObservations]:
-    with get_db() as session:
-        try:
-            series = (
-                session.query(Observations)
-                .filter(Observations.series_id == series_id)
-                .all()
-            )
-            if series:
-                return series
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4"
+
+
+async def timed_body(
+    body: AsyncGenerator[bytes, None], observe: Callable[[], None]
+) -> AsyncGenerator[bytes, None]:
+    # Record the latency once the last chunk is sent or the client disconnects
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        observe()
+
+
+class TimedRoute(APIRoute):
+    """
+    Route recording its latency per path template, method and status.
+    Streaming responses are timed until their last byte.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            start_time = perf_counter()
+            status = 500
+
+            def observe() -> None:
+                metrics.observe(
+                    "http_request_duration_seconds",
+                    perf_counter() - start_time,
+                    method=request.method,
+                    route=self.path_format,
+                    status=str(status),
+                )
+
+            try:
+                response = await handler(request)
+            except HTTPException as e:
+                status = e.status_code
+                observe()
+                raise
+            except Exception:
+                observe()
+                raise
+
+            status = response.status_code
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = timed_body(response.body_iterator, observe)
             else:
-                raise HTTPException(status_code=404, detail="Series not found")
-        except SQLAlchemyError as e:
-            raise HTTPException(status_code=500, detail="Database error") from e
+                observe()
+            return response
+
+        return timed_handler
+
+
+router = APIRouter(route_class=TimedRoute)
+
+
+def filter_dates(
+    statement: Select,
+    table: Observations | Predictions,
+    start: date,
+    end: date,
+    cursor: date,
+    limit: int,
+) -> Select:
+    """
+    Push date range, keyset cursor and limit down into SQL, ordered by date.
+    """
+    if start is not None:
+        statement = statement.where(table.date >= start)
+    if end is not None:
+        statement = statement.where(table.date <= end)
+    if cursor is not None:
+        statement = statement.where(table.date > cursor)
+    return statement.order_by(table.date).limit(limit)
+
+
+def join_pyramid(
+    statement: Select, table: Observations | Predictions, source: str, level: int
+) -> Select:
+    """
+    Keep only the dates of a precomputed LTTB level, all dates without one.
+    """
+    if level is None:
+        return statement
+    return statement.join(
+        Pyramids,
+        and_(
+            Pyramids.series_id == table.series_id,
+            Pyramids.date == table.date,
+            Pyramids.source == source,
+            Pyramids.level == level,
+        ),
+    )
+
+
+def chart_level(points: int, start: date, end: date, cursor: date) -> int:
+    """
+    Pyramid level for a request of points, None when the rows must be
+    downsampled on the fly. Pyramids cover full histories, so a zoomed-in
+    range would only get a fraction of the points from them.
+    """
+    if points is None or start is not None or end is not None or cursor is not None:
+        return None
+    return pyramid_level(points)
+
+
+def select_observations(
+    series_id: str,
+    start: date,
+    end: date,
+    cursor: date,
+    limit: int,
+    level: int = None,
+) -> Select:
+    statement = select(
+        Observations.series_id,
+        Observations.realtime_start,
+        Observations.realtime_end,
+        Observations.date,
+        Observations.value,
+    ).where(Observations.series_id == series_id)
+    return filter_dates(
+        join_pyramid(statement, Observations, "observations", level),
+        Observations,
+        start,
+        end,
+        cursor,
+        limit,
+    )
+
+
+def select_predictions(
+    series_id: str,
+    model: str,
+    start: date,
+    end: date,
+    cursor: date,
+    limit: int,
+    level: int = None,
+) -> Select:
+    statement = select(
+        Predictions.series_id,
+        Predictions.model,
+        Predictions.date,
+        Predictions.value,
+    ).where(
+        Predictions.series_id == series_id,
+        Predictions.model == model,
+        Predictions.run_id == published_run(model),
+    )
+    return filter_dates(
+        join_pyramid(statement, Predictions, model, level),
+        Predictions,
+        start,
+        end,
+        cursor,
+        limit,
+    )
+
+
+async def stream_ndjson(statement: Select) -> AsyncGenerator[bytes, None]:
+    """
+    Stream rows as newline delimited JSON from a server-side cursor,
+    one chunk of rows per write.
+    """
+    async for partition in stream_rows(statement, STREAM_CHUNK_SIZE):
+        yield "".join(
+            json.dumps(row._asdict(), cls=DateEncoder) + "\n" for row in partition
+        ).encode()
 
 
-@router.get("/predictions/{series_id}/{model}", response_model=List[BasePredictions])
-async def get_predictions(series_id: str, model: str) -> List[BasePredictions]:
-    with get_db() as session:
+def negotiate(accept: str) -> str:
+    """
+    Pick the response media type from the Accept header, defaulting to JSON.
+    """
+    if accept is not None:
+        for media_type in [ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE, NDJSON_MEDIA_TYPE]:
+            if media_type in accept:
+                return media_type
+    return JSON_MEDIA_TYPE
+
+
+async def get_page(
+    statement: Select,
+    exists: Select,
+    limit: int,
+    media_type: str,
+    schema: pa.Schema,
+    points: int = None,
+    fallback: Select = None,
+) -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    Serialize a page of rows as JSON, NDJSON or a columnar payload, with the next
+    cursor header when the page is full, raising 404 when the series has
+    no rows at all. With points, at most that many rows are returned,
+    downsampled on the fly when no pyramid level was built for them.
+    """
+    try:
+        rows = await fetch_rows(statement)
+        if not rows and fallback is not None:
+            rows = await fetch_rows(fallback)
+        if not rows and not await fetch_exists(exists):
+            raise HTTPException(status_code=404, detail="Series not found")
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    if points is not None and len(rows) > points:
+        rows = downsample_rows(rows, points)
+
+    headers = {"Vary": "Accept"}
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-Cursor"] = rows[-1].date.isoformat()
+
+    # Columnar payloads are built straight from the result tuples
+    if media_type == JSON_MEDIA_TYPE:
+        body = json.dumps([row._asdict() for row in rows], cls=DateEncoder).encode()
+    elif media_type == NDJSON_MEDIA_TYPE:
+        body = "".join(
+            json.dumps(row._asdict(), cls=DateEncoder) + "\n" for row in rows
+        ).encode()
+    else:
+        body = encode_table(rows_to_table(rows, schema), media_type)
+    return body, media_type, headers
+
+
+async def serve_rows(
+    request: Request,
+    select_rows: Callable[[int], Select],
+    exists: Select,
+    schema: pa.Schema,
+    start: date,
+    end: date,
+    cursor: date,
+    limit: int,
+    points: int,
+    accept: str,
+    if_none_match: str,
+) -> Response:
+    """
+    Respond with the rows of select_rows in the negotiated media type.
+    Full NDJSON ranges are streamed, every other response, including
+    downsampled NDJSON, is built by get_page and served from the response
+    cache. select_rows takes the pyramid level, None for all dates.
+    """
+    # Charts ask for points, served from the largest pyramid level that fits
+    level = chart_level(points, start, end, cursor)
+    statement = select_rows(level)
+    fallback = select_rows(None) if level is not None else None
+
+    # Large ranges can be streamed row by row instead of built into one list
+    media_type = negotiate(accept)
+    if media_type == NDJSON_MEDIA_TYPE and points is None:
+        # Checked up front, a streamed response can no longer change its status
         try:
-            series = (
-                session.query(Predictions)
-                .filter(Predictions.series_id == series_id, Predictions.model == model)
-                .all()
-            )
-            if series:
-                return series
-            else:
-                raise HTTPException(status_code=404, detail="Series not found")
+            found = await fetch_exists(exists)
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail="Database error") from e
+        if not found:
+            raise HTTPException(status_code=404, detail="Series not found")
+        return StreamingResponse(
+            stream_ndjson(statement), media_type=NDJSON_MEDIA_TYPE
+        )
+
+    # Pages are served from the response cache until the next ingest
+    return await route_cache.respond(
+        route_cache.key(request, media_type),
+        lambda: get_page(
+            statement, exists, limit, media_type, schema, points, fallback
+        ),
+        if_none_match,
+    )
+
+
+@router.get(
+    "/series/{series_id}",
+    response_model=List[BaseObservations],
+    responses=COLUMNAR_RESPONSES,
+)
+async def get_observations(
+    series_id: str,
+    request: Request,
+    start: date = None,
+    end: date = None,
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: date = None,
+    points: int = Query(None, ge=3, le=MAX_PAGE_SIZE),
+    accept: str = Header(None),
+    if_none_match: str = Header(None),
+) -> List[BaseObservations]:
+    exists = select(Observations.id).where(Observations.series_id == series_id)
+    return await serve_rows(
+        request,
+        lambda level: select_observations(
+            series_id, start, end, cursor, limit, level
+        ),
+        exists,
+        OBSERVATIONS_SCHEMA,
+        start,
+        end,
+        cursor,
+        limit,
+        points,
+        accept,
+        if_none_match,
+    )
+
+
+@router.get(
+    "/predictions/{series_id}/{model}",
+    response_model=List[BasePredictions],
+    responses=COLUMNAR_RESPONSES,
+)
+async def get_predictions(
+    series_id: str,
+    model: str,
+    request: Request,
+    start: date = None,
+    end: date = None,
+    limit: int = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: date = None,
+    points: int = Query(None, ge=3, le=MAX_PAGE_SIZE),
+    accept: str = Header(None),
+    if_none_match: str = Header(None),
+) -> List[BasePredictions]:
+    exists = select(Predictions.id).where(
+        Predictions.series_id == series_id,
+        Predictions.model == model,
+        Predictions.run_id == published_run(model),
+    )
+    return await serve_rows(
+        request,
+        lambda level: select_predictions(
+            series_id, model, start, end, cursor, limit, level
+        ),
+        exists,
+        PREDICTIONS_SCHEMA,
+        start,
+        end,
+        cursor,
+        limit,
+        points,
+        accept,
+        if_none_match,
+    )
+
+
+def select_frame(
+    series_ids: List[str], model: str, start: date, end: date
+) -> Select:
+    """
+    Values of several series in one query on the natural key index, from
+    the published run's predictions when a model is given and from
+    observations otherwise.
+    """
+    table = Predictions if model is not None else Observations
+    statement = select(table.date, table.series_id, table.value).where(
+        table.series_id.in_(series_ids)
+    )
+    if model is not None:
+        statement = statement.where(
+            Predictions.model == model, Predictions.run_id == published_run(model)
+        )
+    if start is not None:
+        statement = statement.where(table.date >= start)
+    if end is not None:
+        statement = statement.where(table.date <= end)
+    return statement
+
+
+async def get_frame_body(
+    statement: Select, exists: Select, series_ids: List[str], media_type: str
+) -> Tuple[bytes, str, Dict[str, str]]:
+    """
+    Serialize rows as a date-aligned wide table, raising 404 when none of
+    the series has rows at all.
+    """
+    try:
+        rows = await fetch_rows(statement)
+        if not rows and not await fetch_exists(exists):
+            raise HTTPException(status_code=404, detail="Series not found")
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database error") from e
+
+    table = wide_table(rows, series_ids)
+    if media_type in (ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE):
+        return encode_table(table, media_type), media_type, {"Vary": "Accept"}
+
+    # Column oriented JSON, each series id is sent once instead of on every row
+    body = json.dumps(table.to_pydict(), cls=DateEncoder).encode()
+    return body, JSON_MEDIA_TYPE, {"Vary": "Accept"}
+
+
+@router.get("/frame", responses=COLUMNAR_RESPONSES)
+async def get_wide_frame(
+    request: Request,
+    ids: List[str] = Query(..., description="Series ids, repeated or comma separated"),
+    model: str = None,
+    start: date = None,
+    end: date = None,
+    accept: str = Header(None),
+    if_none_match: str = Header(None),
+) -> Response:
+    series_ids = list(
+        dict.fromkeys(
+            series_id.strip()
+            for value in ids
+            for series_id in value.split(",")
+            if series_id.strip()
+        )
+    )
+    if len(series_ids) > MAX_FRAME_SERIES:
+        raise HTTPException(
+            status_code=422, detail=f"At most {MAX_FRAME_SERIES} series per request"
+        )
+
+    statement = select_frame(series_ids, model, start, end)
+    exists = select_frame(series_ids, model, None, None)
+
+    # Wide frames are served from the response cache until the next ingest
+    media_type = negotiate(accept)
+    return await route_cache.respond(
+        route_cache.key(request, media_type),
+        lambda: get_frame_body(statement, exists, series_ids, media_type),
+        if_none_match,
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
@@ -0,0 +1,98 @@
+from pandas import DataFrame
+import pyarrow.feather as feather
+import pyarrow as pa
+
+from typing import List
+from pathlib import Path
+
+from .file_utils import atomic_write_bytes
+from .config import SNAPSHOT_PATH
+from .database import load_observations
+
+
+class AnalysisSnapshot:
+    """
+    Observations materialized as a wide date x series Arrow file, the frame
+    pivot_data builds from the long table. Written at the end of ingest and
+    refreshed per series, so the analysis input is a single columnar read.
+    """
+
+    def __init__(self, path: str | Path = SNAPSHOT_PATH) -> None:
+        self.path = Path(path)
+
+    def read(self) -> pa.Table:
+        """
+        Stored snapshot, None when it has not been written yet.
+        """
+        try:
+            # Memory mapped, float columns are read without copying
+            return feather.read_table(self.path, memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            return None
+
+    def write(self, table: pa.Table) -> None:
+        sink = pa.BufferOutputStream()
+        feather.write_feather(table, sink, compression="uncompressed")
+        atomic_write_bytes(self.path, sink.getvalue().to_pybytes())
+
+    def build(self, series_ids: List[str] = None) -> pa.Table:
+        """
+        Wide table of the stored observations of series_ids, all series by default.
+        """
+        return to_table(load_observations(series_ids))
+
+    def refresh(self, series_ids: List[str], rebuild: bool = False) -> DataFrame:
+        """
+        Replace the columns of refreshed series_ids with their stored
+        observations and return the snapshot as a date-indexed float frame.
+        The whole snapshot is rebuilt when missing or when rebuild is set.
+        """
+        table = None if rebuild else self.read()
+        if table is None:
+            table = self.build()
+            self.write(table)
+        elif series_ids:
+            # Outer join of the untouched columns with the refreshed ones on date
+            refreshed = self.build(series_ids)
+            kept = table.drop_columns(
+                [name for name in series_ids if name in table.column_names]
+            )
+            table = kept.join(refreshed, "date", join_type="full outer")
+            table = table.select(
+                ["date", *sorted(name for name in table.column_names if name != "date")]
+            ).sort_by("date")
+            self.write(table)
+        return to_frame(table)
+
+    def load(self) -> DataFrame:
+        table = self.read()
+        return to_frame(table) if table is not None else None
+
+
+def to_table(df: DataFrame) -> pa.Table:
+    """
+    Date column and one float column per series, missing values as nulls.
+    """
+    return pa.table(
+        {
+            "date": pa.array(df.index.to_numpy(dtype="datetime64[D]"), pa.date32()),
+            **{
+                series_id: pa.array(df[series_id].to_numpy(), from_pandas=True)
+                for series_id in df.columns
+            },
+        }
+    )
+
+
+def to_frame(table: pa.Table) -> DataFrame:
+    """
+    Date-indexed float frame with series as columns, as pivot_data returns.
+    """
+    df = table.to_pandas(date_as_object=False).set_index("date")
+    df.index = df.index.astype("datetime64[ns]")
+    df.columns.name = "series_id"
+    return df.astype(float)
+
+
+# Process-wide snapshot at SNAPSHOT_PATH
+analysis_snapshot = AnalysisSnapshot()
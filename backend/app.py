@@ -2,13 +2,24 @@ from fastapi import FastAPI
 import solara.server.fastapi
 from dotenv import load_dotenv
 
+from contextlib import asynccontextmanager
+
 from .api import data_router
+from .api.database import dispose_async_engine
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close pooled database connections on shutdown
+    await dispose_async_engine()
+
+
 # Initialize FastAPI-Solara server
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Mount the router
 app.include_router(data_router, prefix="/api")
@@ -0,0 +1,58 @@
+from dotenv import load_dotenv
+from pandas import concat
+
+from argparse import ArgumentParser
+from time import perf_counter
+import sys
+import os
+
+# Add root directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+load_dotenv()
+
+from api import analysis_snapshot
+from api.analysis import backtest
+from api.config import (
+    MODELS,
+    BACKTEST_ORIGINS,
+    BACKTEST_HORIZON,
+    BACKTEST_STEP,
+)
+
+
+def main(output: str = None) -> None:
+    # Load the wide observations snapshot, built from the database when missing
+    df = analysis_snapshot.refresh([])
+
+    results = []
+    for model, series_ids in MODELS.items():
+        start_time = perf_counter()  # benchmarking
+
+        # Refit the model at rolling origins and score forecasts against realized data
+        df_metrics = backtest(
+            df,
+            series_ids,
+            n_origins=BACKTEST_ORIGINS,
+            horizon=BACKTEST_HORIZON,
+            step=BACKTEST_STEP,
+        )
+        df_metrics.insert(0, "model", model)
+        results.append(df_metrics)
+
+        end_time = perf_counter()  # benchmarking
+
+        print(f"\n{model}: {end_time - start_time} seconds\n")  # benchmarking
+
+        # Summarize the target series, first in each model group
+        target = df_metrics[df_metrics["series_id"] == series_ids[0]]
+        print(target.to_string(index=False))
+
+    if output is not None:
+        concat(results).to_csv(output, index=False)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Rolling-origin backtest of the VECM models.")
+    parser.add_argument("--output", help="write the metrics table to a CSV file")
+    args = parser.parse_args()
+    main(output=args.output)
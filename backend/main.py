@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 
-from time import perf_counter
+from argparse import ArgumentParser
 import asyncio
 import sys
 import os
@@ -11,154 +11,195 @@ load_dotenv()
 
 from api import (
     build_urls,
+    build_incremental_urls,
+    get_observation_starts,
     get_responses,
+    get_payloads,
+    get_series_id,
+    parse_observations,
     interpolate_data,
+    build_pyramids,
+    FredClient,
+    ResponseCache,
+    analysis_snapshot,
 )
+from api.metrics import metrics
 from api.database import (
     populate_series,
     populate_observations,
     create_tables,
-    fetch_observations,
+    create_run,
     populate_predictions,
+    publish_run,
+    prune_runs,
+    get_sync_state,
+    populate_pyramids,
 )
 from api.analysis import (
-    pivot_data,
-    select_series,
-    unit_root_test,
-    difference_series,
-    cointegration_rank,
-    get_lag_order,
-    vecm_wrapper,
-    get_predictions,
-    inverse_difference_series,
     melt_data,
+    run_models,
+    unit_root_service,
+    model_cache,
 )
 from api.config import (
     BASE_URL,
     SERIES_ENDPOINT,
     OBSERVATIONS_ENDPOINT,
     SERIES_IDS,
-    SEMICONDUCTOR_SERIES,
-    CRYPTOCURRENCY_SERIES,
+    MODELS,
+    FORECAST_STEPS,
+    OBSERVATION_START,
+    INCREMENTAL_LOOKBACK_DAYS,
+    RUN_REPORT_DIR,
 )
 
 
-async def main() -> None:
-    # Build series URLs, about 10 years of data is requested
+async def main(full_refresh: bool = False, use_cache: bool = True) -> None:
+    # Build series URLs, series metadata is always requested
     series_urls = build_urls(
-        BASE_URL, SERIES_ENDPOINT, SERIES_IDS, observation_start="2014-12-01"
+        BASE_URL, SERIES_ENDPOINT, SERIES_IDS, observation_start=OBSERVATION_START
     )
 
-    # Build observations URLs, about 10 years of data is requested
-    observations_urls = build_urls(
-        BASE_URL, OBSERVATIONS_ENDPOINT, SERIES_IDS, observation_start="2014-12-01"
-    )
-
-    start_time = perf_counter()  # benchmarking
-
-    # Send get requests to series URLs and receive JSON response
-    series_responses = await get_responses(series_urls)
-
-    # Send get requests to observations URLs and receive JSON response
-    observations_responses = await get_responses(observations_urls)
-
-    end_time = perf_counter()  # benchmarking
-
-    print(f"\nTime: {end_time - start_time} seconds\n")  # benchmarking
-
-    # Transform nonlinear series to daily frequency with cubic spline interpolation
-    transformed_observations = interpolate_data(observations_responses, "cubicspline")
-
-    # Create Series and Observations tables in database
-    create_tables()
-
-    # Populate Series table with series responses
-    populate_series(series_responses, SERIES_IDS)
-
-    # Populate Observations table with observations including untouched and transformed series
-    populate_observations(transformed_observations)
-
-    # Fetch Observations from database
-    data = fetch_observations()
+    # Reuse cached FRED payloads between runs unless disabled
+    cache = ResponseCache() if use_cache else None
+
+    # One pooled, rate limited client for series and observations requests
+    async with FredClient(cache=cache) as client:
+        with metrics.span("fetch", endpoint="series") as span:
+            # Send get requests to series URLs and receive JSON response
+            series_responses = await get_responses(series_urls, client)
+            span.rows = len(series_responses)
+
+        with metrics.span("sync_state") as span:
+            # Create Series and Observations tables in database
+            create_tables()
+
+            # Compare stored series with FRED metadata, only stale series are requested
+            sync_state = {} if full_refresh else get_sync_state()
+            observation_starts = get_observation_starts(
+                series_responses,
+                sync_state,
+                OBSERVATION_START,
+                INCREMENTAL_LOOKBACK_DAYS,
+            )
+            span.rows = len(observation_starts)
+
+        # Build observations URLs, starting after the last stored date for known series
+        observations_urls = build_incremental_urls(
+            BASE_URL, OBSERVATIONS_ENDPOINT, observation_starts
+        )
+
+        # Cached observations are only reused while the series last_updated matches
+        revisions = {
+            series["id"]: series["last_updated"].isoformat()
+            for series in series_responses
+        }
+
+        with metrics.span("fetch", endpoint="observations") as span:
+            # Send get requests to observations URLs
+            payloads = await get_payloads(observations_urls, client, revisions)
+            span.rows = len(payloads)
+
+    # Parse JSON payloads into columnar frame
+    with metrics.span("parse") as span:
+        observations_responses = parse_observations(payloads)
+        span.rows = len(observations_responses)
+
+    print(f"\nRequests: {client.stats.summary()}\n")  # benchmarking
+    if cache is not None:
+        print(f"Cache: {cache.summary()}\n")  # benchmarking
+    print(f"Refreshing {len(observation_starts)} of {len(SERIES_IDS)} series\n")
+
+    if not observations_responses.empty:
+        # Transform nonlinear series to daily frequency with cubic spline interpolation
+        with metrics.span("interpolate") as span:
+            transformed_observations = interpolate_data(
+                observations_responses, "cubicspline"
+            )
+            span.rows = len(transformed_observations)
+
+    with metrics.span("ingest") as span:
+        # Series whose observations failed to fetch keep their stored metadata,
+        # so the next run still sees them as stale and requests them again
+        fetched_ids = {get_series_id(url) for url, _ in payloads}
+        ingested_responses = [
+            series
+            for series in series_responses
+            if series["id"] not in observation_starts or series["id"] in fetched_ids
+        ]
+
+        # Upsert Series table with series responses
+        populate_series(ingested_responses, SERIES_IDS)
+        span.rows = len(ingested_responses)
+
+        if not observations_responses.empty:
+            # Upsert Observations table with observations including untouched and transformed series
+            span.rows += populate_observations(transformed_observations)
+
+    # Replace refreshed series in the wide observations snapshot, rebuilt from
+    # the database on a full refresh or when missing
+    with metrics.span("snapshot") as span:
+        df = analysis_snapshot.refresh(list(observation_starts), rebuild=full_refresh)
+        span.rows = len(df)
 
     ##############################################
     ################## Analysis ##################
     ##############################################
-    # Pivot data to have dates as index and series as columns
-    df = pivot_data(data)
-
-    # Select groups of series for analyses
-    df_semiconductor = select_series(df, SEMICONDUCTOR_SERIES)
-    df_cryptocurrency = select_series(df, CRYPTOCURRENCY_SERIES)
-
-    # Test for unit root to check if series are stationary
-    semiconductor_p_values_before = unit_root_test(df_semiconductor)
-    cryptocurrency_p_values_before = unit_root_test(df_cryptocurrency)
-
-    # Difference non-stationary series and re-test with adfuller
-    df_semiconductor_differenced, _semiconductor_p_values_after = difference_series(
-        df_semiconductor, semiconductor_p_values_before
-    )
-    df_cryptocurrency_differenced, _cryptocurrency_p_values_after = difference_series(
-        df_cryptocurrency, cryptocurrency_p_values_before
+    # Run each model group's pipeline in its own process, from unit root
+    # tests through VECM fitting to forecasts in the original long schema
+    forecasts = run_models(df, MODELS, steps=FORECAST_STEPS)
+
+    # Store each forecast under a new run, hidden from readers until published
+    with metrics.span("persist") as span:
+        observation_end = df.index[-1].date()
+        run_rows = {}
+        for model, df_forecast_long in forecasts.items():
+            run_id = create_run(model, FORECAST_STEPS, observation_end)
+            run_rows[model] = run_id, populate_predictions(df_forecast_long, run_id)
+        span.rows = sum(row_count for _, row_count in run_rows.values())
+
+    # Precompute LTTB pyramids of refreshed observations and new forecasts,
+    # so charts never receive more points than they can draw. Each run is
+    # published together with its pyramids
+    with metrics.span("downsample") as span:
+        refreshed = [series_id for series_id in observation_starts if series_id in df]
+        span.rows = 0
+        if refreshed:
+            df_pyramids = build_pyramids(melt_data(df[refreshed]))
+            span.rows += populate_pyramids(df_pyramids, "observations")
+        for model, df_forecast_long in forecasts.items():
+            run_id, row_count = run_rows[model]
+            span.rows += publish_run(
+                run_id, row_count, build_pyramids(df_forecast_long)
+            )
+
+    # Delete runs older than the kept ones and the least recently used cache files
+    with metrics.span("prune") as span:
+        span.rows = prune_runs()
+        span.rows += unit_root_service.prune()
+        span.rows += model_cache.prune()
+
+    # Stage timings of this run, also written as a JSON report
+    print(f"\n{metrics.format_spans()}\n")  # benchmarking
+    report_path = metrics.write_report(
+        RUN_REPORT_DIR,
+        requests=client.stats.summary(),
+        cache=cache.summary() if cache is not None else None,
     )
+    print(f"Run report: {report_path}\n")
 
-    # Get cointegration rank for series
-    semiconductor_rank = cointegration_rank(df_semiconductor_differenced)
-    cryptocurrency_rank = cointegration_rank(df_cryptocurrency_differenced)
 
-    # Get lag order for VECM
-    semiconductor_lag_order = get_lag_order(df_semiconductor_differenced)
-    cryptocurrency_lag_order = get_lag_order(df_semiconductor_differenced)
-
-    # Get VECM models
-    semiconductor_model = vecm_wrapper(
-        df_semiconductor_differenced,
-        semiconductor_rank,
-        semiconductor_lag_order,
-    )
-    cryptocurrency_model = vecm_wrapper(
-        df_cryptocurrency_differenced,
-        cryptocurrency_rank,
-        cryptocurrency_lag_order,
-    )
-
-    # Fit VECM models
-    semiconductor_result = semiconductor_model.fit()
-    cryptocurrency_result = cryptocurrency_model.fit()
-
-    # Get predictions from VECM models
-    df_semiconductor_predictions = get_predictions(
-        df_semiconductor_differenced,
-        semiconductor_result,
-        steps=365,  # adjust steps for forecast length
-    )
-    df_cryptocurrency_predictions = get_predictions(
-        df_cryptocurrency_differenced,
-        cryptocurrency_result,
-        steps=365,  # adjust steps for forecast length
-    )
-
-    # Inverse series differencing to get predictions in original scale
-    df_semiconductor_forecast = inverse_difference_series(
-        df_semiconductor_predictions, df_semiconductor, semiconductor_p_values_before
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Fetch FRED data and forecast model series.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="reload the full history instead of an incremental refresh",
     )
-    df_cryptocurrency_forecast = inverse_difference_series(
-        df_cryptocurrency_predictions, df_cryptocurrency, cryptocurrency_p_values_before
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always request FRED instead of reusing cached responses",
     )
-
-    # Inverse pivoting of dataframes back to original long schema
-    df_semiconductor_forecast_long = melt_data(df_semiconductor_forecast)
-    df_cryptocurrency_forecast_long = melt_data(df_cryptocurrency_forecast)
-
-    # Insert categorical model column
-    df_semiconductor_forecast_long["model"] = "semiconductor"
-    df_cryptocurrency_forecast_long["model"] = "cryptocurrency"
-
-    # Populate predictions table
-    populate_predictions(df_semiconductor_forecast_long)
-    populate_predictions(df_cryptocurrency_forecast_long)
-
-
-if __name__ == "__main__":
-    asyncio.run(main())
+    args = parser.parse_args()
+    asyncio.run(main(full_refresh=args.full, use_cache=not args.no_cache))
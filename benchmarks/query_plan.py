@@ -0,0 +1,140 @@
+"""
+Show the query plans and timings of the data routes once the observations
+and predictions tables hold millions of rows.
+
+Seeds synthetic series into the database at DATABASE_URL, so point it at a
+scratch database, not the one main.py populates:
+
+    DATABASE_URL=postgresql://localhost/fred_bench python3 benchmarks/query_plan.py --rows 5000000
+"""
+
+from dotenv import load_dotenv
+import numpy as np
+
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Dict, Generator
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+load_dotenv()
+
+from api.database import (
+    create_tables,
+    bulk_insert,
+    create_run,
+    publish_run,
+    Series,
+    Observations,
+    Predictions,
+)
+from api.database.db_utils import engine
+from api.routes import select_observations, select_predictions, select_frame
+
+START_DATE = date(1970, 1, 1)
+
+
+def generate_rows(
+    n_series: int, n_days: int, model: str = None
+) -> Generator[Dict[str, str | float | date], None, None]:
+    rng = np.random.default_rng(0)
+    for series in range(n_series):
+        values = rng.normal(size=n_days).cumsum()
+        for day in range(n_days):
+            row = {
+                "series_id": f"BENCH{series}",
+                "date": START_DATE + timedelta(days=day),
+                "value": values[day],
+            }
+            if model is None:
+                row["realtime_start"] = row["realtime_end"] = START_DATE
+            else:
+                row["model"] = model
+            yield row
+
+
+def seed(rows: int, n_series: int) -> None:
+    create_tables()
+    n_days = rows // n_series
+    series = [
+        {column.name: None for column in Series.__table__.columns}
+        | {"id": f"BENCH{i}", "is_transformed": False}
+        for i in range(n_series)
+    ]
+    bulk_insert(Series.__table__, series, conflict_keys=["id"])
+    bulk_insert(
+        Observations.__table__,
+        generate_rows(n_series, n_days),
+        conflict_keys=["series_id", "date"],
+    )
+    run_id = create_run("semiconductor", n_days, START_DATE)
+    row_count = bulk_insert(
+        Predictions.__table__,
+        (
+            row | {"run_id": run_id}
+            for row in generate_rows(n_series, n_days, model="semiconductor")
+        ),
+    )
+    publish_run(run_id, row_count)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.exec_driver_sql("ANALYZE observations")
+            connection.exec_driver_sql("ANALYZE predictions")
+
+
+def explain(name: str, statement) -> None:
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    prefix = (
+        "EXPLAIN (ANALYZE, BUFFERS)"
+        if engine.dialect.name == "postgresql"
+        else "EXPLAIN QUERY PLAN"
+    )
+    with engine.connect() as connection:
+        plan = connection.exec_driver_sql(f"{prefix} {sql}").all()
+
+        start_time = perf_counter()  # benchmarking
+        rows = connection.execute(statement).all()
+        elapsed = perf_counter() - start_time  # benchmarking
+
+    print(f"\n{name}: {len(rows)} rows in {elapsed * 1000:.2f} ms")
+    for line in plan:
+        print("    " + " ".join(str(part) for part in line))
+
+
+def main(rows: int, n_series: int, skip_seed: bool) -> None:
+    if not skip_seed:
+        seed(rows, n_series)
+
+    start, end = START_DATE + timedelta(days=1000), START_DATE + timedelta(days=1365)
+    explain(
+        "Observations, full series",
+        select_observations("BENCH0", None, None, None, None),
+    )
+    explain(
+        "Observations, one year range",
+        select_observations("BENCH0", start, end, None, None),
+    )
+    explain(
+        "Observations, page after cursor",
+        select_observations("BENCH0", None, None, end, 1000),
+    )
+    explain(
+        "Predictions, one year range",
+        select_predictions("BENCH0", "semiconductor", start, end, None, None),
+    )
+    explain(
+        "Wide frame, ten series, one year range",
+        select_frame([f"BENCH{i}" for i in range(10)], None, start, end),
+    )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Query plans of the data routes.")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+    main(args.rows, args.series, args.skip_seed)
@@ -0,0 +1,92 @@
+"""
+Compare payload size and client decode time of the JSON, Arrow IPC and
+Parquet encodings of the observations route for a 10-year daily series.
+
+    python3 benchmarks/response_formats.py
+"""
+
+from dotenv import load_dotenv
+from pandas import DataFrame
+import pyarrow.parquet as pq
+import pyarrow as pa
+import numpy as np
+
+from collections import namedtuple
+from datetime import date, timedelta
+from time import perf_counter
+import json
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+load_dotenv()
+
+from api.api_utils import DateEncoder
+from api.columnar import (
+    ARROW_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    OBSERVATIONS_SCHEMA,
+    rows_to_table,
+    encode_table,
+)
+from frontend.providers import read_arrow
+
+Row = namedtuple("Row", OBSERVATIONS_SCHEMA.names)
+
+
+def generate_rows(n_days: int) -> list:
+    # Same shape as the rows select_observations returns
+    values = np.random.default_rng(0).normal(size=n_days).cumsum()
+    start = date(2014, 12, 1)
+    return [
+        Row("IPG3344S", start, start, start + timedelta(days=day), float(values[day]))
+        for day in range(n_days)
+    ]
+
+
+def best_of(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start_time = perf_counter()
+        function()
+        timings.append(perf_counter() - start_time)
+    return min(timings)
+
+
+def main(n_days: int = 3653, repeats: int = 20) -> None:
+    rows = generate_rows(n_days)
+    table = rows_to_table(rows, OBSERVATIONS_SCHEMA)
+    payloads = {
+        "json": json.dumps([row._asdict() for row in rows], cls=DateEncoder).encode(),
+        "arrow": encode_table(table, ARROW_MEDIA_TYPE),
+        "parquet": encode_table(table, PARQUET_MEDIA_TYPE),
+    }
+    decoders = {
+        "json": lambda content: DataFrame(json.loads(content)),
+        "arrow": lambda content: read_arrow(content).to_pandas(
+            date_as_object=False, split_blocks=True, self_destruct=True
+        ),
+        "parquet": lambda content: pq.read_table(pa.BufferReader(content)).to_pandas(
+            date_as_object=False, split_blocks=True, self_destruct=True
+        ),
+    }
+
+    timings = {
+        name: best_of(lambda: decoders[name](content), repeats)
+        for name, content in payloads.items()
+    }
+
+    print(f"\nObservations: {n_days} daily rows\n")
+    for name, content in payloads.items():
+        size_ratio = len(payloads["json"]) / len(content)
+        time_ratio = timings["json"] / timings[name]
+        print(
+            f"{name:>8}: {len(content) / 1024:8.1f} KiB ({size_ratio:4.1f}x smaller), "
+            f"decode {timings[name] * 1000:6.2f} ms ({time_ratio:4.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main()
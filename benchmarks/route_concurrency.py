@@ -0,0 +1,121 @@
+"""
+Measure throughput and latency of the observations route as the number of
+parallel clients grows. With non-blocking database access, requests/sec
+should scale with clients while queries wait on the database, and a cheap
+route probed alongside should stay responsive instead of queueing behind
+every query.
+
+Seed a scratch database with benchmarks/query_plan.py, serve the API on it
+and point the benchmark at the server:
+
+    DATABASE_URL=postgresql://localhost/fred_bench uvicorn backend.app:app
+    python3 benchmarks/route_concurrency.py --url http://localhost:8000
+"""
+
+import aiohttp
+import numpy as np
+
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from time import perf_counter
+from typing import List
+import asyncio
+
+START_DATE = date(1970, 1, 1)
+
+
+async def client(
+    session: aiohttp.ClientSession,
+    url: str,
+    requests: int,
+    n_series: int,
+    n_days: int,
+    limit: int,
+    seed: int,
+) -> List[float]:
+    # Random series and cursors, so each request misses the response cache
+    rng = np.random.default_rng(seed)
+    latencies = []
+    for _ in range(requests):
+        series = rng.integers(n_series)
+        cursor = START_DATE + timedelta(days=int(rng.integers(n_days)))
+        start_time = perf_counter()
+        async with session.get(
+            f"{url}/api/series/BENCH{series}",
+            params={"cursor": cursor.isoformat(), "limit": limit},
+        ) as response:
+            response.raise_for_status()
+            await response.read()
+        latencies.append(perf_counter() - start_time)
+    return latencies
+
+
+async def probe(
+    session: aiohttp.ClientSession, url: str, done: asyncio.Event
+) -> List[float]:
+    # Latency of a route that does not touch the database
+    latencies = []
+    while not done.is_set():
+        start_time = perf_counter()
+        async with session.get(f"{url}/openapi.json") as response:
+            await response.read()
+        latencies.append(perf_counter() - start_time)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run(
+    url: str, clients: int, requests: int, n_series: int, n_days: int, limit: int
+) -> None:
+    async with aiohttp.ClientSession() as session:
+        done = asyncio.Event()
+        probe_task = asyncio.create_task(probe(session, url, done))
+
+        start_time = perf_counter()
+        results = await asyncio.gather(
+            *[
+                client(session, url, requests, n_series, n_days, limit, seed)
+                for seed in range(clients)
+            ]
+        )
+        elapsed = perf_counter() - start_time
+
+        done.set()
+        probe_latencies = np.array(await probe_task) * 1000
+
+    latencies = np.concatenate(results) * 1000
+    print(
+        f"{clients:>4} clients: {latencies.size / elapsed:8.1f} requests/sec, "
+        f"p50 {np.percentile(latencies, 50):7.2f} ms, "
+        f"p95 {np.percentile(latencies, 95):7.2f} ms, "
+        f"probe p95 {np.percentile(probe_latencies, 95):7.2f} ms"
+    )
+
+
+async def main(
+    url: str,
+    clients: List[int],
+    requests: int,
+    n_series: int,
+    n_days: int,
+    limit: int,
+) -> None:
+    print(f"\n{requests} requests of {limit} rows per client against {url}\n")
+    for n_clients in clients:
+        await run(url, n_clients, requests, n_series, n_days, limit)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Concurrency benchmark of the data routes.")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--series", type=int, default=50)
+    parser.add_argument("--days", type=int, default=40_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.url, args.clients, args.requests, args.series, args.days, args.limit
+        )
+    )
@@ -1,26 +1,14 @@
 from matplotlib.pyplot import subplots, Figure
 import matplotlib.pyplot as plt
 import mplcyberpunk
-from pandas import DataFrame
 from solara import component, FigureMatplotlib, Reactive, Button
 
 plt.style.use("cyberpunk")
 
-from frontend.api_utils import get_observations, get_predictions
+from frontend.api_utils import get_chart_data, prefetch_chart_data
 
-
-def get_df_observations(series_id: str) -> DataFrame:
-    """
-    Consume backend API for observations and initialize DataFrame.
-    """
-    return DataFrame(get_observations(series_id))
-
-
-def get_df_predictions(series_id: str, model: str) -> DataFrame:
-    """
-    Consume backend API for predictions and initialize DataFrame.
-    """
-    return DataFrame(get_predictions(series_id, model))
+# Series charted for each model, the other model is prefetched after a chart loads
+MODEL_SERIES = {"semiconductor": "IPG3344S", "cryptocurrency": "CBBTCUSD"}
 
 
 def get_empty_figure() -> Figure:
@@ -37,8 +25,7 @@ def set_reactive_figure(
     """
     Update reactive object with complete figure.
     """
-    df_observations = get_df_observations(series)
-    df_predictions = get_df_predictions(series, model)
+    df_observations, df_predictions = get_chart_data(series, model)
     figure, axes = subplots(nrows=1, ncols=1, figsize=(20, 10))
     df_predictions.plot(
         x="date",
@@ -54,6 +41,11 @@ def set_reactive_figure(
     mplcyberpunk.add_glow_effects(axes, gradient_fill=True)
     reactive_object.set(figure)
 
+    # Warm the cache for the other charts so switching to them is instant
+    for other_model, other_series in MODEL_SERIES.items():
+        if other_model != model:
+            prefetch_chart_data(other_series, other_model)
+
 
 @component
 def SemiconductorButtonClick(reactive_object: Reactive[Figure]):
@@ -64,7 +56,7 @@ def SemiconductorButtonClick(reactive_object: Reactive[Figure]):
         label="Semiconductor",
         on_click=lambda: set_reactive_figure(
             reactive_object=reactive_object,
-            series="IPG3344S",
+            series=MODEL_SERIES["semiconductor"],
             model="semiconductor",
             title="Manufacturing: Semiconductor and Other Electronic Component - ",
         ),
@@ -83,7 +75,7 @@ def CryptocurrencyButtonClick(reactive_object: Reactive[Figure]):
         label="Cryptocurrency",
         on_click=lambda: set_reactive_figure(
             reactive_object=reactive_object,
-            series="CBBTCUSD",
+            series=MODEL_SERIES["cryptocurrency"],
             model="cryptocurrency",
             title="Coinbase Bitcoin (USD) - ",
         ),
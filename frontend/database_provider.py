@@ -0,0 +1,76 @@
+# database_provider.py
+from pandas import DataFrame
+from sqlalchemy import Select
+import pyarrow as pa
+
+from typing import Dict, Tuple
+from threading import Lock
+
+from backend.api.routes import select_observations, select_predictions
+from backend.api.columnar import OBSERVATIONS_SCHEMA, PREDICTIONS_SCHEMA, rows_to_table
+from backend.api.downsample import pyramid_level, downsample_rows
+from backend.api.database import get_db, get_generation
+from frontend.providers import DataProvider, table_to_df
+
+
+class DatabaseProvider(DataProvider):
+    """
+    Query the database straight into DataFrames, for the frontend mounted
+    in the backend process. Skips the HTTP loopback, JSON and validation;
+    frames are cached until the next ingest.
+    """
+
+    def __init__(self) -> None:
+        self.frames: Dict[tuple, Tuple[int, DataFrame]] = {}
+        self.lock = Lock()
+
+    def get_frame(
+        self,
+        key: tuple,
+        statement: Select,
+        schema: pa.Schema,
+        points: int = None,
+        fallback: Select = None,
+    ) -> DataFrame:
+        # A frame is reused until an ingest bumps the generation counter
+        generation = get_generation()
+        with self.lock:
+            cached_generation, df = self.frames.get(key, (None, None))
+        if cached_generation == generation:
+            return df
+
+        with get_db() as session:
+            rows = session.execute(statement).all()
+            # Series without a built pyramid are downsampled on the fly
+            if not rows and fallback is not None:
+                rows = session.execute(fallback).all()
+        if points is not None and len(rows) > points:
+            rows = downsample_rows(rows, points)
+        df = table_to_df(rows_to_table(rows, schema))
+        with self.lock:
+            self.frames[key] = (generation, df)
+        return df
+
+    def get_observations(self, series_id: str, points: int = None) -> DataFrame:
+        level = pyramid_level(points) if points is not None else None
+        return self.get_frame(
+            ("observations", series_id, points),
+            select_observations(series_id, None, None, None, None, level),
+            OBSERVATIONS_SCHEMA,
+            points,
+            select_observations(series_id, None, None, None, None) if level else None,
+        )
+
+    def get_predictions(
+        self, series_id: str, model: str, points: int = None
+    ) -> DataFrame:
+        level = pyramid_level(points) if points is not None else None
+        return self.get_frame(
+            ("predictions", series_id, model, points),
+            select_predictions(series_id, model, None, None, None, None, level),
+            PREDICTIONS_SCHEMA,
+            points,
+            select_predictions(series_id, model, None, None, None, None)
+            if level
+            else None,
+        )
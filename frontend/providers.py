@@ -0,0 +1,117 @@
+# providers.py
+from requests.adapters import HTTPAdapter
+from requests import HTTPError
+from pandas import DataFrame
+import pyarrow as pa
+import requests
+
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+from threading import Lock
+import os
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Connections kept open to the backend per HTTP provider
+POOL_SIZE = 4
+
+
+def read_arrow(content: bytes) -> pa.Table:
+    # Arrow IPC stream, its buffers point into the response body without copying
+    with pa.ipc.open_stream(pa.py_buffer(content)) as reader:
+        return reader.read_all()
+
+
+def table_to_df(table: pa.Table) -> DataFrame:
+    """
+    Convert Arrow table to DataFrame, one block per column so numeric
+    columns are not copied, with dates as datetime64.
+    """
+    return table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+
+
+class DataProvider(ABC):
+    """
+    Source of chart DataFrames for the frontend.
+    """
+
+    @abstractmethod
+    def get_observations(self, series_id: str, points: int = None) -> DataFrame:
+        pass
+
+    @abstractmethod
+    def get_predictions(
+        self, series_id: str, model: str, points: int = None
+    ) -> DataFrame:
+        pass
+
+
+class HttpProvider(DataProvider):
+    """
+    Fetch DataFrames from the backend API at root_domain, for deployments
+    where the frontend does not run in the backend process. Frames are
+    cached with their ETag and revalidated on reuse.
+    """
+
+    def __init__(self, root_domain: str) -> None:
+        self.root_domain = root_domain
+
+        # Pooled session reused by every request to the backend
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=POOL_SIZE))
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=POOL_SIZE))
+
+        self.frames: Dict[str, Tuple[str, DataFrame]] = {}
+        self.lock = Lock()
+
+    def get_frame(self, path: str, points: int = None) -> DataFrame:
+        """
+        Get a DataFrame from the backend, sending the cached ETag so an
+        unchanged response is answered with 304 and the cached frame reused.
+        """
+        url = f"{self.root_domain}{path}"
+        if points is not None:
+            url = f"{url}?points={points}"
+        with self.lock:
+            etag, df = self.frames.get(url, (None, None))
+
+        headers = {"Accept": ARROW_MEDIA_TYPE}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        try:
+            response = self.session.get(url, headers=headers)
+            response.raise_for_status()  # Raises a HTTPError if the status is 4xx, 5xx
+        except HTTPError as e:
+            print(f"Failed to fetch series data: {e}")
+            return DataFrame()
+
+        if response.status_code == 304:
+            return df
+        df = table_to_df(read_arrow(response.content))
+        if "ETag" in response.headers:
+            with self.lock:
+                self.frames[url] = (response.headers["ETag"], df)
+        return df
+
+    def get_observations(self, series_id: str, points: int = None) -> DataFrame:
+        return self.get_frame(f"/api/series/{series_id}", points)
+
+    def get_predictions(
+        self, series_id: str, model: str, points: int = None
+    ) -> DataFrame:
+        return self.get_frame(f"/api/predictions/{series_id}/{model}", points)
+
+
+def create_provider() -> DataProvider:
+    """
+    Select the data provider from DATA_PROVIDER ("database" or "http"),
+    defaulting to HTTP when BACKEND_URL points at a separate backend.
+    """
+    backend_url = os.getenv("BACKEND_URL")
+    default = "http" if backend_url is not None else "database"
+    if os.getenv("DATA_PROVIDER", default) == "database":
+        # Imported here so HTTP deployments of the frontend need no backend
+        from frontend.database_provider import DatabaseProvider
+
+        return DatabaseProvider()
+    return HttpProvider(backend_url or "http://localhost:8000")